@@ -2,14 +2,24 @@ import pygame
 import os
 import json
 from character_creator import CharacterCreator
+from combat_stats import CombatStats
+from hot_reload import DataWatcher
+from leaderboard_screen import LeaderboardScreen
 from main_game_loop import MainGameLoop
+from pvp_loop import MainGameLoop as PvPGameLoop
+from replay import ReplayRecorder
+from run_history import RunHistory
+from scene_manager import Scene, SceneManager, SCREEN_WIDTH, SCREEN_HEIGHT
+from stats_screen import StatsScreen
+from telemetry import Telemetry
 
-class MenuScreen:
-    def __init__(self, screen, options, title="Menu", font_size=36, title_font_size=48, title_color=(255, 255, 255), option_color=(200, 200, 200), selected_color=(255, 0, 0)):
+class MenuScreen(Scene):
+    caption = "Main Menu"
+
+    def __init__(self, options, title="Menu", font_size=36, title_font_size=48, title_color=(255, 255, 255), option_color=(200, 200, 200), selected_color=(255, 0, 0), on_select=None):
         """
         Initialize the MenuScreen.
 
-        :param screen: The Pygame screen surface to draw on.
         :param options: A list of menu options (strings).
         :param title: The title of the menu (string).
         :param font_size: The font size for the menu options.
@@ -17,8 +27,8 @@ class MenuScreen:
         :param title_color: The color of the title text.
         :param option_color: The color of the menu options.
         :param selected_color: The color of the selected menu option.
+        :param on_select: Callback invoked with the manager and the selected option index.
         """
-        self.screen = screen
         self.options = options
         self.title = title
         self.font_size = font_size
@@ -27,25 +37,23 @@ class MenuScreen:
         self.option_color = option_color
         self.selected_color = selected_color
         self.selected_index = 0
-
-        # Initialize fonts
-        self.title_font = pygame.font.Font(None, self.title_font_size)
-        self.option_font = pygame.font.Font(None, self.font_size)
+        self.on_select = on_select
 
     def draw(self):
         """Draw the menu on the screen."""
         self.screen.fill((0, 0, 0))  # Clear the screen with a black background
 
         # Draw the title
-        title_surface = self.title_font.render(self.title, True, self.title_color)
-        title_rect = title_surface.get_rect(center=(self.screen.get_width() // 2, self.screen.get_height() // 4))
+        viewport = self.manager.viewport
+        title_surface = viewport.text(self.title, self.title_font_size, self.title_color)
+        title_rect = title_surface.get_rect(center=viewport.point(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4))
         self.screen.blit(title_surface, title_rect)
 
         # Draw the menu options
         for i, option in enumerate(self.options):
             color = self.selected_color if i == self.selected_index else self.option_color
-            option_surface = self.option_font.render(option, True, color)
-            option_rect = option_surface.get_rect(center=(self.screen.get_width() // 2, self.screen.get_height() // 2 + i * self.font_size))
+            option_surface = viewport.text(option, self.font_size, color)
+            option_rect = option_surface.get_rect(center=viewport.point(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + i * self.font_size))
             self.screen.blit(option_surface, option_rect)
 
     def handle_input(self, event):
@@ -64,20 +72,15 @@ class MenuScreen:
 
         return None
 
-    def run(self):
-        """Run the menu screen and return the selected option index."""
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    return None
-
-                selected_option = self.handle_input(event)
-                if selected_option is not None:
-                    return selected_option
+    def handle_event(self, event):
+        """
+        Handle a Pygame event and dispatch the selected option.
 
-            self.draw()
-            pygame.display.flip()
+        :param event: The Pygame event to handle.
+        """
+        selected_option = self.handle_input(event)
+        if selected_option is not None and self.on_select is not None:
+            self.on_select(self.manager, selected_option)
 
 def check_for_character_profile():
     """
@@ -87,41 +90,73 @@ def check_for_character_profile():
     """
     return os.path.exists("character_profile.json")
 
-def launch_pve_mode():
+def launch_pve_mode(manager, run_history=None, combat_stats=None):
     """
     Launch the PvE mode. If no character profile exists, create one first.
+
+    :param manager: The SceneManager to push the next screen onto.
+    :param run_history: Optional RunHistory that stores finished runs.
+    :param combat_stats: Optional CombatStats that counts the fights of every run.
     """
     if not check_for_character_profile():
         print("No character profile found. Launching character creator...")
-        creator = CharacterCreator()
-        creator.run()  # Run the character creator
-        return  # Exit the function to prevent launching the game
+        # The creator switches to the game once the profile is saved
+        manager.push(CharacterCreator(run_history=run_history, combat_stats=combat_stats))
+        return
 
     # If the character profile exists, launch the game
     print("Launching PvE mode...")
-    game = MainGameLoop("character_profile.json", "data/monsters.json")
-    game.run()
+    manager.push(MainGameLoop("character_profile.json", "data/monsters.json", telemetry=manager.telemetry,
+                              recorder=ReplayRecorder.from_env(), run_history=run_history, combat_stats=combat_stats))
 
 
-def launch_pvp_mode():
+def launch_pvp_mode(manager):
     """
-    Launch the PvP mode (placeholder for now).
+    Launch the PvP mode against the AI opponent.
+
+    :param manager: The SceneManager to push the next screen onto.
     """
-    print("PvP mode is not implemented yet.")
+    print("Launching PvP mode...")
+    manager.push(PvPGameLoop("pvp_profile.json", telemetry=manager.telemetry))
 
-# Example usage
-if __name__ == "__main__":
-    pygame.init()
-    screen = pygame.display.set_mode((800, 600))
-    pygame.display.set_caption("Menu Screen Example")
+def launch_leaderboard(manager, run_history):
+    """
+    Show the leaderboard of recorded runs.
+
+    :param manager: The SceneManager to push the next screen onto.
+    :param run_history: The RunHistory to read from.
+    """
+    character = None
+    if check_for_character_profile():
+        with open("character_profile.json", "r") as file:
+            character = json.load(file)
+    manager.push(LeaderboardScreen(run_history, character))
 
-    menu = MenuScreen(screen, ["PvE", "PvP"], title="Main Menu")
-    selected_option = menu.run()
+def handle_main_menu_selection(manager, selected_option, run_history=None, combat_stats=None):
+    """
+    Launch the mode picked in the main menu.
 
-    if selected_option is not None:
-        if selected_option == 0:  # PvE
-            launch_pve_mode()
-        elif selected_option == 1:  # PvP
-            launch_pvp_mode()
+    :param manager: The SceneManager running the menu.
+    :param selected_option: The index of the selected option.
+    :param run_history: Optional RunHistory that stores and lists finished runs.
+    :param combat_stats: Optional CombatStats that counts and shows the fights of every run.
+    """
+    if selected_option == 0:  # PvE
+        launch_pve_mode(manager, run_history, combat_stats)
+    elif selected_option == 1:  # PvP
+        launch_pvp_mode(manager)
+    elif selected_option == 2 and run_history is not None:  # Leaderboard
+        launch_leaderboard(manager, run_history)
+    elif selected_option == 3 and combat_stats is not None:  # Statistics
+        manager.push(StatsScreen(combat_stats))
 
-    pygame.quit()
\ No newline at end of file
+# Example usage
+if __name__ == "__main__":
+    run_history = RunHistory("run_history.db")
+    combat_stats = CombatStats.load("combat_stats.bin")
+    manager = SceneManager(telemetry=Telemetry.from_env(), data_watcher=DataWatcher.from_env())
+    manager.push(MenuScreen(["PvE", "PvP", "Leaderboard", "Statistics"], title="Main Menu",
+                            on_select=lambda manager, option: handle_main_menu_selection(manager, option, run_history,
+                                                                                         combat_stats)))
+    manager.run()
+    run_history.close()
\ No newline at end of file
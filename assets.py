@@ -0,0 +1,251 @@
+import os
+import queue
+import threading
+from pathlib import Path
+import pygame
+from cache import LRUCache
+
+# Art is looked up as <directory>/<category>/<id>.png, where the categories are
+# the data files the records come from (monsters, weapons, armors, spells, ascendances)
+ASSET_DIR = "assets"
+IMAGE_EXTENSION = ".png"
+
+# Largest side of a decoded image; bigger art is scaled down on the worker thread
+MAX_IMAGE_SIZE = 256
+
+# Gap left between images on an atlas page so scaled sprites do not bleed into each other
+ATLAS_PADDING = 1
+
+# Colors of the placeholder shown until an image is ready
+PLACEHOLDER_FILL = (40, 40, 40)
+PLACEHOLDER_BORDER = (90, 90, 90)
+
+class AtlasPage:
+    def __init__(self, size):
+        """
+        Initialize an atlas page that packs images onto shelves.
+
+        Images are placed left to right on a shelf as tall as the first image on it;
+        a new shelf is opened below when an image does not fit on any existing one.
+
+        :param size: The page's width and height in pixels.
+        """
+        self.size = size
+        self.surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        self.shelves = []  # [y, height, next free x] per shelf
+        self.next_shelf_y = 0
+        self.keys = []
+
+    def insert(self, key, image):
+        """
+        Copy an image onto the page.
+
+        :param key: The image's asset key.
+        :param image: The image surface.
+        :return: The subsurface holding the image, or None if the page is full.
+        """
+        width, height = image.get_width() + ATLAS_PADDING, image.get_height() + ATLAS_PADDING
+        if width > self.size or height > self.size:
+            return None
+
+        for shelf in self.shelves:
+            if height <= shelf[1] and shelf[2] + width <= self.size:
+                break
+        else:
+            if self.next_shelf_y + height > self.size:
+                return None
+            shelf = [self.next_shelf_y, height, 0]
+            self.shelves.append(shelf)
+            self.next_shelf_y += height
+
+        rect = pygame.Rect(shelf[2], shelf[0], image.get_width(), image.get_height())
+        shelf[2] += width
+        self.surface.blit(image, rect)
+        self.keys.append(key)
+        return self.surface.subsurface(rect)
+
+class AssetManager:
+    def __init__(self, directory=ASSET_DIR, page_size=1024, max_pages=8, uploads_per_frame=4):
+        """
+        Initialize the asset manager for monster and item art.
+
+        Images are decoded on a worker thread and packed into atlas pages on the
+        game thread. Until an image is ready, a placeholder is served in its place.
+        Pages are kept in an LRU: when a new page is needed and max_pages are in use,
+        the least recently drawn page is dropped and its images are loaded again
+        the next time they are asked for.
+
+        :param directory: Directory holding the art.
+        :param page_size: Width and height of each atlas page in pixels.
+        :param max_pages: Number of atlas pages kept.
+        :param uploads_per_frame: Number of decoded images packed per frame.
+        """
+        self.directory = Path(directory)
+        self.page_size = page_size
+        self.uploads_per_frame = uploads_per_frame
+        self._pages = LRUCache(max_pages)
+        self._page_ids = 0
+        self._entries = {}  # key -> (page id, subsurface)
+        self._pending = set()
+        self._missing = set()
+        self._placeholders = {}
+        self._requests = queue.Queue()
+        self._decoded = queue.Queue()
+        self._worker = None
+
+    def _path(self, key):
+        """
+        Get the file an asset key refers to.
+
+        :param key: A (category, id) tuple.
+        :return: The image path.
+        """
+        category, asset_id = key
+        return self.directory / category / f"{asset_id}{IMAGE_EXTENSION}"
+
+    def _decode_loop(self):
+        """
+        Decode requested images on the worker thread until None is requested.
+        """
+        while True:
+            key = self._requests.get()
+            if key is None:
+                return
+            try:
+                image = pygame.image.load(str(self._path(key)))
+                width, height = image.get_size()
+                largest = max(width, height)
+                if largest > MAX_IMAGE_SIZE:
+                    scale = MAX_IMAGE_SIZE / largest
+                    image = pygame.transform.smoothscale(image, (max(1, round(width * scale)), max(1, round(height * scale))))
+            except (OSError, pygame.error) as error:
+                print(f"Assets: could not load {self._path(key)}: {error}")
+                image = None
+            self._decoded.put((key, image))
+
+    def request(self, key):
+        """
+        Start loading an image in the background if it is not loaded or on its way.
+
+        :param key: A (category, id) tuple.
+        """
+        if key in self._entries or key in self._pending or key in self._missing:
+            return
+        if not os.path.exists(self._path(key)):
+            self._missing.add(key)
+            return
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._decode_loop, name="asset-decoder", daemon=True)
+            self._worker.start()
+        self._pending.add(key)
+        self._requests.put(key)
+
+    def prefetch(self, category, records):
+        """
+        Start loading the art of the records a screen is about to show.
+
+        :param category: The records' category, such as "monsters".
+        :param records: Dictionaries with an "id".
+        """
+        for record in records:
+            self.request((category, record["id"]))
+
+    def pump(self):
+        """
+        Pack a few decoded images into the atlas. Called once per frame on the game thread.
+        """
+        for _ in range(self.uploads_per_frame):
+            try:
+                key, image = self._decoded.get_nowait()
+            except queue.Empty:
+                return
+            self._pending.discard(key)
+            if image is None:
+                self._missing.add(key)
+                continue
+            self._pack(key, image)
+
+    def _pack(self, key, image):
+        """
+        Copy a decoded image onto an atlas page, opening a new page if none has room.
+
+        :param key: The image's asset key.
+        :param image: The decoded surface.
+        """
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        for page_id, page in self._pages.items():
+            sprite = page.insert(key, image)
+            if sprite is not None:
+                self._entries[key] = (page_id, sprite)
+                return
+
+        page = AtlasPage(max(self.page_size, image.get_width() + ATLAS_PADDING, image.get_height() + ATLAS_PADDING))
+        self._page_ids += 1
+        evicted = self._pages.put(self._page_ids, page)
+        if evicted is not None:
+            for evicted_key in evicted[1].keys:
+                self._entries.pop(evicted_key, None)
+        self._entries[key] = (self._page_ids, page.insert(key, image))
+
+    def placeholder(self, width, height):
+        """
+        Get the placeholder surface drawn while an image is not ready.
+
+        :param width: Width in pixels.
+        :param height: Height in pixels.
+        :return: A pygame.Surface.
+        """
+        surface = self._placeholders.get((width, height))
+        if surface is None:
+            surface = self._placeholders[(width, height)] = pygame.Surface((width, height))
+            surface.fill(PLACEHOLDER_FILL)
+            pygame.draw.rect(surface, PLACEHOLDER_BORDER, surface.get_rect(), 1)
+        return surface
+
+    def get(self, category, asset_id):
+        """
+        Get the image of a record, asking for it to be loaded if it is not ready.
+
+        :param category: The record's category, such as "monsters".
+        :param asset_id: The record's id.
+        :return: The image surface, or None while it is loading or if there is no art for it.
+        """
+        key = (category, asset_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.request(key)
+            return None
+        self._pages.get(entry[0])  # Mark the page as recently drawn
+        return entry[1]
+
+    def draw(self, viewport, screen, category, asset_id, x, y, width, height):
+        """
+        Draw a record's image at a logical position and size, or a placeholder until it is ready.
+        Records without art are skipped.
+
+        :param viewport: The Viewport mapping logical coordinates to the window.
+        :param screen: The surface to draw on.
+        :param category: The record's category, such as "monsters".
+        :param asset_id: The record's id.
+        :param x: Logical X position.
+        :param y: Logical Y position.
+        :param width: Logical width.
+        :param height: Logical height.
+        """
+        image = self.get(category, asset_id)
+        if image is not None:
+            surface = viewport.scaled(("asset", category, asset_id), image, width, height)
+        elif (category, asset_id) in self._pending:
+            surface = self.placeholder(viewport.length(width), viewport.length(height))
+        else:
+            return  # There is no art for this record
+
+        screen.blit(surface, viewport.point(x, y))
+
+    def close(self):
+        """Stop the worker thread."""
+        if self._worker is not None:
+            self._requests.put(None)
+            self._worker.join()
+            self._worker = None
@@ -0,0 +1,180 @@
+import time
+from cache import LRUCache
+from combat_rules import turn_outcomes
+
+# Values of finished fights; any unfinished position scores between them
+WIN_VALUE = 1000.0
+LOSS_VALUE = -1000.0
+
+class _OutOfTime(Exception):
+    """Raised inside the search when the decision budget is used up."""
+
+class Autopilot:
+    def __init__(self, budget=0.002, cache_size=200000, max_depth=16, max_nodes=None):
+        """
+        Initialize the PvE autopilot, which picks moves by expectimax search.
+
+        The enemy picks uniformly from its attack pool and the neutral flinch chance
+        is a chance node, following resolve_combat. Evaluated positions are kept in
+        a bounded transposition cache keyed on (player_hp, enemy template, enemy_hp).
+
+        :param budget: Seconds each decision may take; the search deepens until it runs out.
+        :param cache_size: Maximum number of positions kept in the transposition cache.
+        :param max_depth: Deepest search, in turns.
+        :param max_nodes: Optional number of positions each decision may visit, cache hits and
+                          leaves included, over every deepening pass. When set, it replaces the time budget, so the chosen move does not depend on how fast
+                          the machine is and a seeded game plays the same every time.
+        """
+        self.budget = budget
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self._nodes = 0
+        self.cache = LRUCache(cache_size)
+        self.last_depth = 0
+        self._build = None
+        self._tables = LRUCache(256)
+        self._deadline = 0.0
+
+    def reset(self):
+        """
+        Forget every cached table and position, for when the monster or item data changed.
+        """
+        self._build = None
+        self._tables.clear()
+        self.cache.clear()
+
+    def _template_key(self, enemy):
+        """
+        Get the key identifying an enemy's template, scaled for its floor, in the caches.
+
+        :param enemy: The enemy dictionary.
+        :return: A hashable key.
+        """
+        return (enemy["id"], enemy.get("floor"))
+
+    def _outcome_table(self, moves, armor_rating, enemy):
+        """
+        Get the turn outcomes for every (enemy attack, player move) pair, computed once per template.
+
+        :param moves: The player's moves.
+        :param armor_rating: The player's armor rating.
+        :param enemy: The enemy dictionary.
+        :return: A list with, per enemy attack, a list of outcome lists per player move.
+        """
+        build = (armor_rating, tuple((move["type"], move["damage"]) for move in moves))
+        if build != self._build:
+            # Cached values are only valid for one player build
+            self._build = build
+            self._tables.clear()
+            self.cache.clear()
+
+        template = self._template_key(enemy)
+        table = self._tables.get(template)
+        if table is None:
+            table = [
+                [turn_outcomes(move, attack, armor_rating) for move in moves]
+                for attack in enemy["attacks"]
+            ]
+            self._tables.put(template, table)
+        return table
+
+    def choose_move(self, moves, player_hp, armor_rating, enemy, enemy_move=None):
+        """
+        Choose the player's move for this turn.
+
+        :param moves: The player's moves (player_stats["moves"]).
+        :param player_hp: The player's current health.
+        :param armor_rating: The player's armor rating.
+        :param enemy: The current enemy dictionary.
+        :param enemy_move: The enemy's already chosen move, if it is known.
+        :return: The index of the chosen move.
+        """
+        self._deadline = time.perf_counter() + self.budget
+        self._nodes = 0
+        table = self._outcome_table(moves, armor_rating, enemy)
+        template = self._template_key(enemy)
+        if enemy_move is not None:
+            root = [[turn_outcomes(move, enemy_move, armor_rating) for move in moves]]
+        else:
+            root = table
+
+        # Fall back to the best immediate expected damage if even depth 1 runs out of time
+        best_index = max(range(len(moves)), key=lambda i: sum(
+            p * (dealt - taken) for rows in root for p, dealt, taken in rows[i]))
+
+        self.last_depth = 0
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best_index = self._search_root(root, table, template, player_hp, enemy["health"], depth)
+            except _OutOfTime:
+                break
+            self.last_depth = depth
+        return best_index
+
+    def _search_root(self, root, table, template, player_hp, enemy_hp, depth):
+        """
+        Find the move with the best expected value at the given depth.
+
+        :return: The index of the best move.
+        """
+        best_index = 0
+        best_value = None
+        for index in range(len(root[0])):
+            value = 0.0
+            for rows in root:
+                for p, dealt, taken in rows[index]:
+                    value += p * self._after(table, template, player_hp - taken, enemy_hp - dealt, depth - 1)
+            value /= len(root)
+            if best_value is None or value > best_value:
+                best_index = index
+                best_value = value
+        return best_index
+
+    def _after(self, table, template, player_hp, enemy_hp, depth):
+        """
+        Score the position after a turn was resolved.
+
+        :return: The expected value of the position.
+        """
+        if self.max_nodes is not None:
+            self._nodes += 1
+            if self._nodes > self.max_nodes:
+                raise _OutOfTime()
+
+        # resolve_combat ends the game before it hands out the kill
+        if player_hp <= 0:
+            return LOSS_VALUE - enemy_hp
+        if enemy_hp <= 0:
+            return WIN_VALUE + player_hp
+        if depth == 0:
+            return player_hp - enemy_hp
+        return self._expectimax(table, template, player_hp, enemy_hp, depth)
+
+    def _expectimax(self, table, template, player_hp, enemy_hp, depth):
+        """
+        Average over the enemy's attacks of the best reply to each.
+
+        :return: The expected value of the position.
+        """
+        key = (round(player_hp, 2), template, round(enemy_hp, 2))
+        cached = self.cache.get(key)
+        if cached is not None and cached[0] >= depth:
+            return cached[1]
+
+        if self.max_nodes is None and time.perf_counter() > self._deadline:
+            raise _OutOfTime()
+
+        total = 0.0
+        for rows in table:
+            best = None
+            for outcomes in rows:
+                value = 0.0
+                for p, dealt, taken in outcomes:
+                    value += p * self._after(table, template, player_hp - taken, enemy_hp - dealt, depth - 1)
+                if best is None or value > best:
+                    best = value
+            total += best
+        value = total / len(table)
+
+        self.cache.put(key, (depth, value))
+        return value
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+
+class LRUCache:
+    def __init__(self, max_size):
+        """
+        Initialize a bounded cache that evicts the least recently used entries.
+
+        :param max_size: Maximum number of entries kept.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Look up an entry and mark it as recently used.
+
+        :param key: The entry's key.
+        :param default: Value returned if the key is missing.
+        :return: The cached value, or default.
+        """
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        """
+        Store an entry, evicting the least recently used one if the cache is full.
+
+        :param key: The entry's key.
+        :param value: The value to store.
+        :return: The evicted (key, value) pair, or None.
+        """
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            return entries.popitem(last=False)
+        return None
+
+    def pop(self, key, default=None):
+        """
+        Remove an entry.
+
+        :param key: The entry's key.
+        :param default: Value returned if the key is missing.
+        :return: The removed value, or default.
+        """
+        return self._entries.pop(key, default)
+
+    def values(self):
+        """
+        List the cached values without marking them as recently used.
+
+        :return: A list of values, least recently used first.
+        """
+        return list(self._entries.values())
+
+    def items(self):
+        """
+        List the cached entries without marking them as recently used.
+
+        :return: A list of (key, value) pairs, least recently used first.
+        """
+        return list(self._entries.items())
+
+    def clear(self):
+        """Remove every entry."""
+        self._entries.clear()
@@ -3,26 +3,34 @@ import json
 from pathlib import Path
 
 from main_game_loop import MainGameLoop  # Make sure this import works with your structure
+from replay import ReplayRecorder
+from scene_manager import Scene, SceneManager
 
 # Initialize Pygame
 pygame.init()
 
 # Constants
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-FONT = pygame.font.Font(None, 36)
+FONT = 36
+ICON_SIZE = 32
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 HIGHLIGHT = (200, 200, 0)
 
-class CharacterCreator:
-    def __init__(self):
+# Data file, and so art category, of the items offered at each step
+STEP_CATEGORIES = {"ascendancy": "ascendances", "weapon": "weapons", "armor": "armors", "spell": "spells"}
+
+class CharacterCreator(Scene):
+    caption = "Character Creator"
+
+    def __init__(self, run_history=None, combat_stats=None):
         """
         Initialize the Character Creator.
+
+        :param run_history: Optional RunHistory handed to the game once the character is created.
+        :param combat_stats: Optional CombatStats handed to the game once the character is created.
         """
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Character Creator")
-        self.clock = pygame.time.Clock()
+        self.run_history = run_history
+        self.combat_stats = combat_stats
 
         # Load databases
         self.ascendances = self._load_json("data/ascendances.json")
@@ -36,6 +44,7 @@ class CharacterCreator:
         self.selected_armor = None
         self.selected_spell = None
         self.current_step = "ascendancy"  # Steps: ascendancy -> weapon -> armor -> spell -> save
+        self.selected_index = 0
 
     def _load_json(self, path):
         """
@@ -44,65 +53,88 @@ class CharacterCreator:
         with open(path, "r") as file:
             return json.load(file)
 
+    def on_data_reload(self, change):
+        """
+        Show the edited items of a data file that was changed while the creator is open.
+
+        :param change: A change dictionary from DataWatcher.poll().
+        """
+        if change["name"] in ("ascendances", "weapons", "armors", "spells"):
+            setattr(self, change["name"], [dict(item) for item in change["records"]])
+            self.selected_index = min(self.selected_index, max(0, len(self.get_current_items()) - 1))
+
     def draw_text(self, text, x, y, color=WHITE):
         """
         Draw text on the screen.
         """
-        text_surface = FONT.render(text, True, color)
-        self.screen.blit(text_surface, (x, y))
+        self.manager.draw_text(text, x, y, color, FONT)
+
+    def on_enter(self):
+        """
+        Start loading the item icons in the background.
+        """
+        for category in STEP_CATEGORIES.values():
+            self.manager.assets.prefetch(category, getattr(self, category))
 
     def draw_menu(self, title, items, selected_index):
         """
-        Draw a menu with a title and a list of selectable items.
+        Draw a menu with a title and a list of selectable items, each with its icon.
         """
         self.draw_text(title, 50, 50)
+        category = STEP_CATEGORIES.get(self.current_step)
         for i, item in enumerate(items):
             color = HIGHLIGHT if i == selected_index else WHITE
-            self.draw_text(f"{i + 1}. {item['name']}", 50, 100 + i * 40, color)
+            self.manager.assets.draw(self.manager.viewport, self.screen, category, item["id"],
+                                     50, 96 + i * 40, ICON_SIZE, ICON_SIZE)
+            self.draw_text(f"{i + 1}. {item['name']}", 50 + ICON_SIZE + 8, 100 + i * 40, color)
+
+    def handle_event(self, event):
+        """
+        Handle a Pygame event for the current step.
+
+        :param event: The Pygame event to handle.
+        """
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                self.selected_index = (self.selected_index - 1) % len(self.get_current_items())
+            elif event.key == pygame.K_DOWN:
+                self.selected_index = (self.selected_index + 1) % len(self.get_current_items())
+            elif event.key == pygame.K_RETURN:
+                self.handle_selection(self.selected_index)
+                self.selected_index = 0  # Reset selection for the next step
+            elif event.key == pygame.K_ESCAPE:
+                self.manager.pop()
+
+    def update(self):
+        """
+        Save the profile and switch to the game once every step is done.
+        """
+        if self.current_step == "save":
+            self.save_character()
+            self.launch_game()  # Launch the game after character creation
+
+    def draw(self):
+        """
+        Draw the current step.
+        """
+        self.screen.fill(BLACK)
+
+        if self.current_step == "ascendancy":
+            self.draw_menu("Choose Your Ascendancy", self.ascendances, self.selected_index)
+        elif self.current_step == "weapon":
+            self.draw_menu("Choose Your Weapon", self.weapons, self.selected_index)
+        elif self.current_step == "armor":
+            self.draw_menu("Choose Your Armor", self.armors, self.selected_index)
+        elif self.current_step == "spell":
+            self.draw_menu("Choose Your Spell (Optional)", self.spells, self.selected_index)
 
     def run(self):
         """
-        Run the character creator.
-        """
-        running = True
-        selected_index = 0
-
-        while running:
-            self.screen.fill(BLACK)
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP:
-                        selected_index = (selected_index - 1) % len(self.get_current_items())
-                    elif event.key == pygame.K_DOWN:
-                        selected_index = (selected_index + 1) % len(self.get_current_items())
-                    elif event.key == pygame.K_RETURN:
-                        self.handle_selection(selected_index)
-                        selected_index = 0  # Reset selection for the next step
-                    elif event.key == pygame.K_ESCAPE:
-                        running = False
-
-            # Draw the current step
-            if self.current_step == "ascendancy":
-                self.draw_menu("Choose Your Ascendancy", self.ascendances, selected_index)
-            elif self.current_step == "weapon":
-                self.draw_menu("Choose Your Weapon", self.weapons, selected_index)
-            elif self.current_step == "armor":
-                self.draw_menu("Choose Your Armor", self.armors, selected_index)
-            elif self.current_step == "spell":
-                self.draw_menu("Choose Your Spell (Optional)", self.spells, selected_index)
-            elif self.current_step == "save":
-                self.draw_text("Character Created! Saving profile...", 50, 50)
-                self.save_character()
-                running = False  # Exit character creator after saving
-
-            pygame.display.flip()
-            self.clock.tick(30)
-
-        self.launch_game()  # Launch the game after character creation
-        pygame.quit()
+        Run the character creator as the only screen of a new SceneManager.
+        """
+        manager = SceneManager()
+        manager.push(self)
+        manager.run()
 
     def get_current_items(self):
         """
@@ -157,11 +189,12 @@ class CharacterCreator:
 
     def launch_game(self):
         """
-        Launch the main game loop after character creation.
+        Replace the character creator with the main game loop.
         """
         print("Launching PvE mode...")
-        game = MainGameLoop("character_profile.json", "data/monsters.json")
-        game.run()
+        self.manager.replace(MainGameLoop("character_profile.json", "data/monsters.json", telemetry=self.manager.telemetry,
+                                          recorder=ReplayRecorder.from_env(), run_history=self.run_history,
+                                          combat_stats=self.combat_stats))
 
 # Run the character creator
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+# Rock-Paper-Scissors combat rules shared by the PvE game loop and the tools
+# that simulate or predict its fights.
+
+# Outcomes of the player's move type against the enemy's move type
+SUPERIOR = "superior"
+NEUTRAL = "neutral"
+WEAK = "weak"
+
+# Move type each type beats
+BEATS = {
+    "Rock": "Scissors",
+    "Paper": "Rock",
+    "Scissors": "Paper",
+}
+
+# Move types as integers for batched combat: (player - enemy) % 3 is
+# 0 for a neutral, 1 for a superior and 2 for a weak outcome
+TYPE_CODES = {
+    "Rock": 0,
+    "Paper": 1,
+    "Scissors": 2,
+}
+
+# Damage multipliers for the player's attack
+SUPERIOR_MULTIPLIER = 1.75
+NEUTRAL_MULTIPLIER = 1.0
+WEAK_MULTIPLIER = 0.75
+
+# Multiplier for the enemy's attack when the player's move is weak
+WEAK_ENEMY_MULTIPLIER = 1.25
+
+# Chance that the enemy flinches on a neutral outcome
+NEUTRAL_FLINCH_CHANCE = 0.05
+
+def rps_outcome(player_type, enemy_type):
+    """
+    Determine the outcome of the player's move type against the enemy's.
+
+    :param player_type: The player's move type (Rock, Paper or Scissors).
+    :param enemy_type: The enemy's move type.
+    :return: SUPERIOR, NEUTRAL or WEAK.
+    """
+    if player_type == enemy_type:
+        return NEUTRAL
+    if BEATS.get(player_type) == enemy_type:
+        return SUPERIOR
+    return WEAK
+
+def damage_taken(enemy_damage, armor_rating):
+    """
+    Apply the player's armor to the enemy's damage.
+
+    :param enemy_damage: The enemy's damage before armor.
+    :param armor_rating: The player's armor rating (percent reduction).
+    :return: The damage the player takes.
+    """
+    return enemy_damage * (1 - armor_rating / 100)
+
+def turn_outcomes(player_move, enemy_move, armor_rating):
+    """
+    List the possible results of one turn, given both moves.
+
+    :param player_move: The player's move dictionary (type and damage).
+    :param enemy_move: The enemy's move dictionary (type and damage).
+    :param armor_rating: The player's armor rating.
+    :return: A list of (probability, damage dealt, damage taken) tuples.
+    """
+    outcome = rps_outcome(player_move["type"], enemy_move["type"])
+
+    if outcome == SUPERIOR:
+        # Enemy flinches and skips their attack
+        return [(1.0, player_move["damage"] * SUPERIOR_MULTIPLIER, 0)]
+    if outcome == WEAK:
+        return [(1.0, player_move["damage"] * WEAK_MULTIPLIER,
+                 damage_taken(enemy_move["damage"] * WEAK_ENEMY_MULTIPLIER, armor_rating))]
+
+    dealt = player_move["damage"] * NEUTRAL_MULTIPLIER
+    return [
+        (NEUTRAL_FLINCH_CHANCE, dealt, 0),
+        (1 - NEUTRAL_FLINCH_CHANCE, dealt, damage_taken(enemy_move["damage"], armor_rating)),
+    ]
+
+def move_preview(player_move, enemy_attacks, armor_rating):
+    """
+    Summarize how a move resolves against an enemy that picks uniformly from its attacks.
+
+    :param player_move: The player's move dictionary.
+    :param enemy_attacks: The enemy's attack dictionaries.
+    :param armor_rating: The player's armor rating.
+    :return: A dictionary with the expected damage "dealt" and "taken", and "dealt_chances":
+             a list of (damage dealt, probability) pairs, highest damage first.
+    """
+    dealt_chances = {}
+    expected_dealt = 0.0
+    expected_taken = 0.0
+    for attack in enemy_attacks:
+        for p, dealt, taken in turn_outcomes(player_move, attack, armor_rating):
+            p /= len(enemy_attacks)
+            dealt_chances[dealt] = dealt_chances.get(dealt, 0.0) + p
+            expected_dealt += p * dealt
+            expected_taken += p * taken
+    return {
+        "dealt": expected_dealt,
+        "taken": expected_taken,
+        "dealt_chances": sorted(dealt_chances.items(), reverse=True),
+    }
+
+def kill_chance(preview, enemy_health):
+    """
+    Get the chance that a move kills the enemy this turn.
+
+    :param preview: The move's summary from move_preview().
+    :param enemy_health: The enemy's current health.
+    :return: The probability, from 0.0 to 1.0.
+    """
+    chance = 0.0
+    for dealt, p in preview["dealt_chances"]:
+        if dealt < enemy_health:
+            break
+        chance += p
+    return chance
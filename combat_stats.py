@@ -0,0 +1,228 @@
+import os
+import struct
+import sys
+from array import array
+from combat_rules import NEUTRAL, SUPERIOR, TYPE_CODES, WEAK
+
+# Outcome codes, matching (player type - enemy type) % 3 of the type codes
+OUTCOME_CODES = {NEUTRAL: 0, SUPERIOR: 1, WEAK: 2}
+
+# Counter slots per monster id and per attack of a monster; ids and attacks
+# beyond them are not counted
+MONSTER_SLOTS = 256
+ATTACK_SLOTS = 4
+
+# File layout: magic, format version, monster slots, attack slots, then the
+# lifetime counters followed by the last run's, little-endian
+STATS_PATH = "combat_stats.bin"
+FILE_MAGIC = b"LNST"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sHHH")
+
+class StatCounters:
+    def __init__(self, monster_slots=MONSTER_SLOTS, attack_slots=ATTACK_SLOTS):
+        """
+        Initialize a set of preallocated combat counters, all at zero.
+
+        :param monster_slots: Number of monster ids counted.
+        :param attack_slots: Number of attacks counted per monster.
+        """
+        self.monster_slots = monster_slots
+        self.attack_slots = attack_slots
+        types = len(TYPE_CODES)
+        self.matchups = array("Q", bytes(8 * types * types * len(OUTCOME_CODES)))  # [player type][enemy type][outcome]
+        self.monster_turns = array("Q", bytes(8 * monster_slots))
+        self.monster_kills = array("Q", bytes(8 * monster_slots))
+        self.attack_uses = array("Q", bytes(8 * monster_slots * attack_slots))  # [monster id][attack]
+        self.attack_damage = array("d", bytes(8 * monster_slots * attack_slots))
+
+    def arrays(self):
+        """
+        List the counter arrays in the order they are saved.
+
+        :return: A list of arrays.
+        """
+        return [self.matchups, self.monster_turns, self.monster_kills, self.attack_uses, self.attack_damage]
+
+    def clear(self):
+        """Set every counter back to zero."""
+        for counters in self.arrays():
+            for index in range(len(counters)):
+                counters[index] = 0
+
+    def matchup_index(self, player_type, enemy_type, outcome):
+        """
+        Get the slot of a type matchup in the matchups array.
+
+        :param player_type: The player's move type code.
+        :param enemy_type: The enemy's move type code.
+        :param outcome: The outcome code.
+        :return: The index.
+        """
+        return (player_type * len(TYPE_CODES) + enemy_type) * len(OUTCOME_CODES) + outcome
+
+class CombatStats:
+    def __init__(self, path=STATS_PATH, monster_slots=MONSTER_SLOTS, attack_slots=ATTACK_SLOTS):
+        """
+        Initialize the per-run and lifetime combat statistics.
+
+        Every counter lives in a fixed-size array indexed by type matchup or by monster
+        id, so recording a turn is a few index updates and the stats screen reads the
+        arrays directly.
+
+        :param path: Path to the binary stats file.
+        :param monster_slots: Number of monster ids counted.
+        :param attack_slots: Number of attacks counted per monster.
+        """
+        self.path = path
+        self.run = StatCounters(monster_slots, attack_slots)
+        self.lifetime = StatCounters(monster_slots, attack_slots)
+
+    @classmethod
+    def load(cls, path=STATS_PATH):
+        """
+        Load the statistics saved at a path, or start empty ones if there is no file yet.
+
+        :param path: Path to the binary stats file.
+        :return: A CombatStats instance.
+        """
+        stats = cls(path)
+        if not os.path.exists(path):
+            return stats
+
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) >= FILE_HEADER.size:
+            magic, version, monster_slots, attack_slots = FILE_HEADER.unpack_from(data)
+            saved = StatCounters(monster_slots, attack_slots)
+            expected_size = FILE_HEADER.size + 2 * sum(len(counters) * counters.itemsize for counters in saved.arrays())
+        if len(data) < FILE_HEADER.size or magic != FILE_MAGIC or version != FILE_VERSION or len(data) != expected_size:
+            print(f"Stats: {path} is not a version {FILE_VERSION} stats file, starting fresh.")
+            return stats
+
+        stats = cls(path, max(monster_slots, MONSTER_SLOTS), max(attack_slots, ATTACK_SLOTS))
+        offset = FILE_HEADER.size
+        for target in (stats.lifetime, stats.run):
+            for counters in saved.arrays():
+                size = len(counters) * counters.itemsize
+                counters[:] = array(counters.typecode, data[offset:offset + size])
+                offset += size
+            if sys.byteorder == "big":
+                for counters in saved.arrays():
+                    counters.byteswap()
+            _copy_counters(saved, target)
+        return stats
+
+    def save(self):
+        """
+        Write the lifetime and last run's counters to the stats file.
+        """
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, self.run.monster_slots, self.run.attack_slots))
+            for counters in self.lifetime.arrays() + self.run.arrays():
+                if sys.byteorder == "big":
+                    counters = array(counters.typecode, counters)
+                    counters.byteswap()
+                counters.tofile(file)
+        os.replace(temp_path, self.path)
+
+    def start_run(self):
+        """Reset the per-run counters for a new run."""
+        self.run.clear()
+
+    def record_turn(self, player_type, enemy_type, outcome, monster_id, attack_index, damage_taken, count=1):
+        """
+        Count one resolved turn, or take back one counted before.
+
+        :param player_type: The player's move type (Rock, Paper or Scissors).
+        :param enemy_type: The enemy's move type.
+        :param outcome: The outcome from combat_rules.rps_outcome().
+        :param monster_id: The enemy's monster id.
+        :param attack_index: Index of the enemy's attack in its attack list, or None if it is not known.
+        :param damage_taken: The damage the enemy's attack dealt to the player.
+        :param count: 1 to count the turn, -1 to take back a turn that was undone.
+        """
+        matchup = self.run.matchup_index(TYPE_CODES[player_type], TYPE_CODES[enemy_type], OUTCOME_CODES[outcome])
+        counted = monster_id < self.run.monster_slots
+        attack_counted = counted and attack_index is not None and attack_index < self.run.attack_slots
+        attack = monster_id * self.run.attack_slots + (attack_index or 0)
+        for counters in (self.run, self.lifetime):
+            counters.matchups[matchup] += count
+            if counted:
+                counters.monster_turns[monster_id] += count
+            if attack_counted:
+                counters.attack_uses[attack] += count
+                counters.attack_damage[attack] += count * damage_taken
+
+    def record_kill(self, monster_id):
+        """
+        Count a defeated monster.
+
+        :param monster_id: The monster's id.
+        """
+        if monster_id < self.run.monster_slots:
+            self.run.monster_kills[monster_id] += 1
+            self.lifetime.monster_kills[monster_id] += 1
+
+def _copy_counters(source, target):
+    """
+    Copy counters into a set with at least as many slots, keeping each monster's and attack's slot.
+    """
+    target.matchups[:] = source.matchups
+    for monster_id in range(source.monster_slots):
+        target.monster_turns[monster_id] = source.monster_turns[monster_id]
+        target.monster_kills[monster_id] = source.monster_kills[monster_id]
+        for attack_index in range(source.attack_slots):
+            source_index = monster_id * source.attack_slots + attack_index
+            target_index = monster_id * target.attack_slots + attack_index
+            target.attack_uses[target_index] = source.attack_uses[source_index]
+            target.attack_damage[target_index] = source.attack_damage[source_index]
+
+def summarize(counters, monsters, limit=3):
+    """
+    Aggregate a set of counters for the stats screen.
+
+    :param counters: The StatCounters to read.
+    :param monsters: A dictionary of monster id to monster dictionary.
+    :param limit: Number of attacks and monsters listed.
+    :return: A dictionary with the turn count, the turns per outcome, the turns per
+             (player type, enemy type), the attacks with the most damage as
+             (damage, uses, monster name, attack name) and the monsters with the
+             most turns per kill as (turns per kill, name, kills).
+    """
+    types = list(TYPE_CODES)
+    outcomes = {outcome: 0 for outcome in OUTCOME_CODES}
+    matchups = {}
+    for player_type in types:
+        for enemy_type in types:
+            total = 0
+            for outcome, code in OUTCOME_CODES.items():
+                count = counters.matchups[counters.matchup_index(TYPE_CODES[player_type], TYPE_CODES[enemy_type], code)]
+                outcomes[outcome] += count
+                total += count
+            matchups[(player_type, enemy_type)] = total
+
+    attacks = []
+    for index, damage in enumerate(counters.attack_damage):
+        uses = counters.attack_uses[index]
+        monster_id, attack_index = divmod(index, counters.attack_slots)
+        monster = monsters.get(monster_id)
+        if uses and monster is not None and attack_index < len(monster["attacks"]):
+            attacks.append((damage, uses, monster["name"], monster["attacks"][attack_index]["name"]))
+    attacks.sort(reverse=True)
+
+    slowest = []
+    for monster_id, monster in monsters.items():
+        kills = counters.monster_kills[monster_id] if monster_id < counters.monster_slots else 0
+        if kills:
+            slowest.append((counters.monster_turns[monster_id] / kills, monster["name"], kills))
+    slowest.sort(reverse=True)
+
+    return {
+        "turns": sum(outcomes.values()),
+        "outcomes": outcomes,
+        "matchups": matchups,
+        "top_attacks": attacks[:limit],
+        "slowest_monsters": slowest[:limit],
+    }
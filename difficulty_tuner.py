@@ -0,0 +1,285 @@
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from combat_rules import turn_outcomes
+
+# Win rate the reference builds should reach against a single monster of each danger level
+TARGET_WIN_RATES = {
+    1: 0.95,  # Normal
+    2: 0.85,  # Elite
+    3: 0.60,  # Boss
+}
+
+# Range of the strength factor searched, relative to the monster's current stats
+MIN_STRENGTH = 0.125
+MAX_STRENGTH = 8.0
+
+# The reference player's starting health, as in MainGameLoop._get_player_stats()
+PLAYER_HEALTH = 100
+
+# Fights running longer than this are counted as losses
+MAX_TURNS = 500
+
+# Where the tuned database and the cache go by default; kept out of data/ so the
+# hot-reload watcher never picks up a half-written tuning result
+TUNING_DIR = "tuning"
+
+def reference_builds(weapons, armors, spells):
+    """
+    List every combination of weapon, armor and spell as a build to tune against.
+
+    :param weapons: The weapons database.
+    :param armors: The armors database.
+    :param spells: The spells database.
+    :return: A list of (moves, armor_rating) tuples, with the moves as in MainGameLoop.
+    """
+    builds = []
+    for weapon, armor, spell in itertools.product(weapons, armors, spells):
+        moves = [spell, {"name": weapon["name"], "type": weapon["type"], "damage": weapon["damage"]}]
+        builds.append((moves, armor["armor_value"]))
+    return builds
+
+def scale_monster(monster, strength):
+    """
+    Make a monster stronger or weaker while keeping the balance between its stats.
+
+    Health and damage are each scaled by the square root of the strength, so the
+    damage a fight costs the player grows roughly in proportion to the strength.
+
+    :param monster: The monster dictionary.
+    :param strength: The strength factor (1.0 keeps the monster as it is).
+    :return: A new monster dictionary with rounded stats.
+    """
+    factor = strength ** 0.5
+    scaled = dict(monster)
+    scaled["health"] = max(1, round(monster["health"] * factor))
+    scaled["attack"] = max(1, round(monster["attack"] * factor))
+    scaled["attacks"] = [dict(attack, damage=max(0, round(attack["damage"] * factor))) for attack in monster["attacks"]]
+    return scaled
+
+def fight_plan(moves, armor_rating, monster):
+    """
+    Work out how a reference player answers each of a monster's attacks.
+
+    The enemy's move is announced before the player chooses, and the reference player
+    picks the move with the best expected damage dealt minus damage taken.
+
+    :param moves: The player's moves.
+    :param armor_rating: The player's armor rating.
+    :param monster: The monster dictionary.
+    :return: Per enemy attack, the (cumulative probability, dealt, taken) outcomes of the chosen move.
+    """
+    plan = []
+    for attack in monster["attacks"]:
+        best = max((turn_outcomes(move, attack, armor_rating) for move in moves),
+                   key=lambda outcomes: sum(p * (dealt - taken) for p, dealt, taken in outcomes))
+        cumulative = 0.0
+        steps = []
+        for p, dealt, taken in best:
+            cumulative += p
+            steps.append((cumulative, dealt, taken))
+        plan.append(steps)
+    return plan
+
+def simulate_fights(plan, enemy_health, fights, rng):
+    """
+    Play a batch of fights between a reference player at full health and one monster.
+
+    The rules follow MainGameLoop.resolve_combat: the player loses when their health
+    drops to zero, even on the turn the monster dies.
+
+    :param plan: The fight plan from fight_plan().
+    :param enemy_health: The monster's health.
+    :param fights: Number of fights to play.
+    :param rng: The random.Random instance to draw from.
+    :return: Number of fights the player won.
+    """
+    random_value = rng.random
+    attacks = len(plan)
+    wins = 0
+    for _ in range(fights):
+        player_hp = PLAYER_HEALTH
+        enemy_hp = enemy_health
+        for _ in range(MAX_TURNS):
+            steps = plan[int(random_value() * attacks)]
+            if len(steps) == 1:
+                _, dealt, taken = steps[0]
+            else:
+                roll = random_value()
+                for cumulative, dealt, taken in steps:
+                    if roll < cumulative:
+                        break
+            player_hp -= taken
+            enemy_hp -= dealt
+            if player_hp <= 0:
+                break
+            if enemy_hp <= 0:
+                wins += 1
+                break
+    return wins
+
+def win_rate(monster, builds, fights, seed):
+    """
+    Estimate how often the reference builds beat a monster.
+
+    Every estimate of the same monster draws the same random numbers, so comparing
+    two strengths measures the change in stats rather than noise.
+
+    :param monster: The monster dictionary.
+    :param builds: The reference builds.
+    :param fights: Number of fights per build.
+    :param seed: Seed of the fights' random numbers.
+    :return: The win rate, from 0.0 to 1.0.
+    """
+    rng = random.Random(seed)
+    wins = 0
+    for moves, armor_rating in builds:
+        wins += simulate_fights(fight_plan(moves, armor_rating, monster), monster["health"], fights, rng)
+    return wins / (fights * len(builds))
+
+def tune_monster(monster, target, builds, fights=200, iterations=12, seed=0):
+    """
+    Find the strength at which the reference builds beat a monster at the target rate.
+
+    The win rate falls as the strength rises, so the strength is bisected on a log
+    scale between MIN_STRENGTH and MAX_STRENGTH.
+
+    :param monster: The monster dictionary.
+    :param target: The target win rate.
+    :param builds: The reference builds.
+    :param fights: Number of fights per build and estimate.
+    :param iterations: Number of bisection steps.
+    :param seed: Seed of the fights' random numbers.
+    :return: A dictionary with the tuned monster and its win rates before and after.
+    """
+    seed = seed * 1000003 + monster["id"]
+    low, high = MIN_STRENGTH, MAX_STRENGTH
+    for _ in range(iterations):
+        middle = (low * high) ** 0.5
+        if win_rate(scale_monster(monster, middle), builds, fights, seed) > target:
+            low = middle
+        else:
+            high = middle
+
+    # Win rates move in steps as the stats cross a hit, so keep whichever end of the
+    # final bracket lands closer to the target once the stats are rounded
+    candidates = []
+    for strength in (low, high):
+        tuned = scale_monster(monster, strength)
+        candidates.append((strength, tuned, win_rate(tuned, builds, fights, seed)))
+    strength, tuned, tuned_rate = min(candidates, key=lambda candidate: abs(candidate[2] - target))
+    return {
+        "monster": tuned,
+        "strength": strength,
+        "win_rate_before": win_rate(monster, builds, fights, seed),
+        "win_rate_after": tuned_rate,
+    }
+
+def monster_fingerprint(monster, target, builds, fights, iterations, seed):
+    """
+    Identify a tuning job, so monsters whose stats and settings did not change are not tuned again.
+
+    :return: A hex digest.
+    """
+    job = [monster, target, builds, fights, iterations, seed]
+    return hashlib.sha256(json.dumps(job, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _tune_job(job):
+    """
+    Unpack a tuning job inside a pool process.
+    """
+    return tune_monster(*job)
+
+def tune_monsters(monsters, builds, targets=None, fights=200, iterations=12, seed=0, cache_path=None, workers=None):
+    """
+    Tune every monster of a database to the target win rate of its danger level.
+
+    :param monsters: The monster database.
+    :param builds: The reference builds.
+    :param targets: A dictionary of danger level to target win rate (defaults to TARGET_WIN_RATES).
+    :param fights: Number of fights per build and estimate.
+    :param iterations: Number of bisection steps per monster.
+    :param seed: Seed of the fights' random numbers.
+    :param cache_path: Optional JSON file of earlier results, reused for unchanged monsters.
+    :param workers: Number of worker processes (defaults to the number of CPUs).
+    :return: A list of per-monster results, in database order, each with a "cached" flag.
+    """
+    targets = targets or TARGET_WIN_RATES
+    cache = {}
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, "r") as file:
+            cache = json.load(file)
+
+    results = [None] * len(monsters)
+    jobs = []
+    for index, monster in enumerate(monsters):
+        target = targets[monster["danger_level"]]
+        key = monster_fingerprint(monster, target, builds, fights, iterations, seed)
+        if key in cache:
+            results[index] = dict(cache[key], cached=True)
+        else:
+            jobs.append((index, key, (monster, target, builds, fights, iterations, seed)))
+
+    if jobs:
+        with multiprocessing.Pool(processes=min(workers or os.cpu_count() or 1, len(jobs))) as pool:
+            tuned = pool.map(_tune_job, [job for _, _, job in jobs])
+        for (index, key, _), result in zip(jobs, tuned):
+            cache[key] = result
+            results[index] = dict(result, cached=False)
+
+    if cache_path:
+        with open(cache_path, "w") as file:
+            json.dump(cache, file)
+    return results
+
+def _load_json(path):
+    """
+    Load a JSON file from the given path.
+    """
+    with open(path, "r") as file:
+        return json.load(file)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune monster stats to target win rates against every reference build.")
+    parser.add_argument("--monsters", default="data/monsters.json", help="Monster database to tune.")
+    parser.add_argument("--output", default=os.path.join(TUNING_DIR, "monsters.tuned.json"),
+                        help="Where to write the tuned monster database.")
+    parser.add_argument("--data", default="data", help="Directory with the weapons, armors and spells databases.")
+    parser.add_argument("--normal", type=float, default=TARGET_WIN_RATES[1], help="Target win rate against normal monsters.")
+    parser.add_argument("--elite", type=float, default=TARGET_WIN_RATES[2], help="Target win rate against elite monsters.")
+    parser.add_argument("--boss", type=float, default=TARGET_WIN_RATES[3], help="Target win rate against bosses.")
+    parser.add_argument("--fights", type=int, default=200, help="Fights per build for each win rate estimate.")
+    parser.add_argument("--iterations", type=int, default=12, help="Bisection steps per monster.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the simulated fights.")
+    parser.add_argument("--cache", default=os.path.join(TUNING_DIR, "cache.json"), help="Cache of earlier results, keyed by monster.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    args = parser.parse_args()
+
+    for path in (args.output, args.cache):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    start = time.perf_counter()
+    monsters = _load_json(args.monsters)
+    builds = reference_builds(_load_json(os.path.join(args.data, "weapons.json")),
+                              _load_json(os.path.join(args.data, "armors.json")),
+                              _load_json(os.path.join(args.data, "spells.json")))
+    targets = {1: args.normal, 2: args.elite, 3: args.boss}
+    results = tune_monsters(monsters, builds, targets, args.fights, args.iterations, args.seed, args.cache, args.workers)
+
+    with open(args.output, "w") as file:
+        json.dump([result["monster"] for result in results], file, indent=4)
+
+    print(f"Tuned {len(results)} monsters against {len(builds)} builds in {time.perf_counter() - start:.1f}s:")
+    for monster, result in zip(monsters, results):
+        tuned = result["monster"]
+        print(f"  - {monster['name']} (Danger Level: {monster['danger_level']}, target {targets[monster['danger_level']]:.0%}): "
+              f"health {monster['health']} -> {tuned['health']}, attack {monster['attack']} -> {tuned['attack']}, "
+              f"win rate {result['win_rate_before']:.0%} -> {result['win_rate_after']:.0%}"
+              f"{' (cached)' if result['cached'] else ''}")
+    print(f"Tuned monster database written to {args.output}")
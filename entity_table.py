@@ -0,0 +1,150 @@
+import numpy as np
+from combat_rules import NEUTRAL_FLINCH_CHANCE, TYPE_CODES, WEAK_ENEMY_MULTIPLIER
+
+# Outcome codes of (player type - enemy type) % 3, from the player's side
+NEUTRAL_CODE = 0
+SUPERIOR_CODE = 1
+WEAK_CODE = 2
+
+class EntityTable:
+    def __init__(self, capacity=256, max_attacks=4):
+        """
+        Initialize a table of combat entities stored column by column.
+
+        Every stat is a preallocated array with one slot per entity, so a turn of the
+        whole room is a handful of array operations that write into scratch buffers
+        instead of creating new objects. The table only grows when a room is loaded
+        with more entities than it has room for.
+
+        :param capacity: Number of entities the columns are allocated for.
+        :param max_attacks: Number of attacks each entity can have.
+        """
+        self.size = 0
+        self.max_attacks = max_attacks
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """
+        Allocate every column and scratch buffer for a number of entities.
+
+        :param capacity: Number of entities.
+        """
+        self.capacity = capacity
+        self.health = np.zeros(capacity)
+        self.attack = np.zeros(capacity)
+        self.type = np.zeros(capacity, dtype=np.int8)
+        self.weakness = np.zeros(capacity, dtype=np.int8)
+        self.attack_types = np.zeros((capacity, self.max_attacks), dtype=np.int8)
+        self.attack_damage = np.zeros((capacity, self.max_attacks))
+        self.attack_count = np.ones(capacity)
+        self.move = np.zeros(capacity, dtype=np.intp)
+        self.move_type = np.zeros(capacity, dtype=np.int8)
+        self.move_damage = np.zeros(capacity)
+
+        # Scratch buffers reused by every turn
+        self._row_start = np.arange(capacity, dtype=np.intp) * self.max_attacks
+        self._flat_index = np.zeros(capacity, dtype=np.intp)
+        self._rolls = np.zeros(capacity)
+        self._outcome = np.zeros(capacity, dtype=np.int8)
+        self._mask = np.zeros(capacity, dtype=bool)
+        self._neutral = np.zeros(capacity, dtype=bool)
+        self._scale = np.zeros(capacity)
+        self._hits = np.zeros(capacity)
+
+    def load(self, monsters):
+        """
+        Fill the table with a room's monsters.
+
+        :param monsters: The monster dictionaries, in room order.
+        """
+        if len(monsters) > self.capacity:
+            self._allocate(max(len(monsters), 2 * self.capacity))
+        self.size = len(monsters)
+        for index, monster in enumerate(monsters):
+            attacks = monster["attacks"][:self.max_attacks]
+            self.health[index] = monster["health"]
+            self.attack[index] = monster["attack"]
+            self.type[index] = TYPE_CODES[monster["type"]]
+            self.weakness[index] = TYPE_CODES.get(monster["weakness"], -1)
+            self.attack_count[index] = len(attacks)
+            for slot, attack in enumerate(attacks):
+                self.attack_types[index, slot] = TYPE_CODES[attack["type"]]
+                self.attack_damage[index, slot] = attack["damage"]
+
+    def choose_moves(self, rng):
+        """
+        Pick an attack for every entity, uniformly among its own attacks.
+
+        :param rng: The numpy.random.Generator to draw from.
+        """
+        n = self.size
+        rolls = self._rolls[:n]
+        rng.random(out=rolls)
+        np.multiply(rolls, self.attack_count[:n], out=rolls)
+        np.floor(rolls, out=rolls)
+        self.move[:n] = rolls
+        np.add(self._row_start[:n], self.move[:n], out=self._flat_index[:n])
+        np.take(self.attack_types.reshape(-1), self._flat_index[:n], out=self.move_type[:n])
+        np.take(self.attack_damage.reshape(-1), self._flat_index[:n], out=self.move_damage[:n])
+
+    def resolve_attacks(self, player_type, start, rng):
+        """
+        Resolve the chosen attacks of every living entity from an index onward against the player's move.
+
+        Each attack follows the same rules as a single enemy's in MainGameLoop.resolve_combat:
+        a superior player move makes the entity flinch, a weak one makes it hit harder, and
+        a neutral one lets it flinch by chance.
+
+        :param player_type: The type code of the player's move.
+        :param start: Index of the first entity that attacks.
+        :param rng: The numpy.random.Generator to draw the flinches from.
+        :return: A (damage, hits) tuple: the total damage before armor and the number of attacks that landed.
+        """
+        n = self.size
+        if start >= n:
+            return 0.0, 0
+        outcome = self._outcome[start:n]
+        mask = self._mask[start:n]
+        scale = self._scale[start:n]
+        hits = self._hits[start:n]
+        rolls = self._rolls[start:n]
+
+        np.subtract(player_type, self.move_type[start:n], out=outcome)
+        np.remainder(outcome, 3, out=outcome)
+        np.copyto(hits, self.move_damage[start:n])
+
+        # Living entities only
+        np.greater(self.health[start:n], 0, out=mask)
+        np.multiply(hits, mask, out=hits)
+
+        # Countered attacks are skipped
+        np.not_equal(outcome, SUPERIOR_CODE, out=mask)
+        np.multiply(hits, mask, out=hits)
+
+        # Attacks against a weak move hit harder
+        np.equal(outcome, WEAK_CODE, out=mask)
+        np.multiply(mask, WEAK_ENEMY_MULTIPLIER - 1, out=scale)
+        np.add(scale, 1, out=scale)
+        np.multiply(hits, scale, out=hits)
+
+        # Neutral attacks flinch by chance
+        neutral = self._neutral[start:n]
+        rng.random(out=rolls)
+        np.less(rolls, NEUTRAL_FLINCH_CHANCE, out=mask)
+        np.equal(outcome, NEUTRAL_CODE, out=neutral)
+        np.logical_and(mask, neutral, out=mask)
+        np.logical_not(mask, out=mask)
+        np.multiply(hits, mask, out=hits)
+
+        return float(hits.sum()), int(np.count_nonzero(hits))
+
+    def living(self, start=0):
+        """
+        Count the living entities from an index onward.
+
+        :param start: Index of the first entity counted.
+        :return: The number of entities with health left.
+        """
+        mask = self._mask[start:self.size]
+        np.greater(self.health[start:self.size], 0, out=mask)
+        return int(np.count_nonzero(mask))
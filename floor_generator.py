@@ -1,15 +1,74 @@
 import json
 import random
 from pathlib import Path
+from hot_reload import patch_record
+from monster_scaling import MonsterScaler
+
+# Number of steps monster difficulty is quantized to when composing rooms
+DIFFICULTY_LEVELS = 64
+
+# Monsters scored or sorted into buckets per step when a danger level's difficulty buckets are built
+SCORE_CHUNK = 512
+
+# Share of the difficulty range a floor's rooms are filled to: it starts low and
+# grows with every floor until floors are as hard as the database allows
+BUDGET_START = 0.15
+BUDGET_GROWTH = 0.05
+BUDGET_JITTER = 0.1
+
+# Every HORDE_FLOOR_INTERVAL-th floor has a horde room of normal monsters before the boss,
+# which grows from HORDE_MIN_SIZE towards HORDE_MAX_SIZE with the floor's budget
+HORDE_ROOM = "Horde"
+HORDE_FLOOR_INTERVAL = 5
+HORDE_MIN_SIZE = 24
+HORDE_MAX_SIZE = 160
+
+def monster_difficulty(monster):
+    """
+    Score how hard a monster is to beat from its health, attack and attack damage.
+
+    :param monster: The monster dictionary.
+    :return: The difficulty score.
+    """
+    damages = [attack["damage"] for attack in monster.get("attacks", [])] or [0]
+    return monster["health"] * (monster["attack"] + sum(damages) / len(damages))
+
+def _finish(steps):
+    """
+    Run a generator of steps to the end at once.
+
+    :param steps: A generator that yields between steps.
+    :return: The generator's return value.
+    """
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+def floor_budget(floor_number):
+    """
+    Get the difficulty budget of a floor.
+
+    :param floor_number: The floor's number, starting at 1.
+    :return: The budget as a fraction of the difficulty range, from 0.0 to 1.0.
+    """
+    return min(1.0, BUDGET_START + BUDGET_GROWTH * (floor_number - 1))
 
 class FloorGenerator:
-    def __init__(self, monster_db_path):
+    def __init__(self, monster_db_path, rng=None, scaler=None):
         """
         Initialize the FloorGenerator with the path to the monster database.
 
         :param monster_db_path: Path to the JSON file containing the monster database.
+        :param rng: Optional random.Random instance used for floor generation (defaults to the global random module).
+        :param scaler: Optional MonsterScaler that scales the spawned monsters by floor.
         """
         self.monster_db = self._load_monster_db(monster_db_path)
+        self.rng = rng or random
+        self.scaler = scaler or MonsterScaler()
+        self._buckets = {}
+        self._room_tables = {}
 
     def _load_monster_db(self, path):
         """
@@ -21,6 +80,39 @@ class FloorGenerator:
         with open(path, "r") as file:
             return json.load(file)
 
+    def apply_monster_changes(self, change):
+        """
+        Patch the loaded monster database in place with an edited monsters file.
+
+        Monsters that were already spawned are patched with patch_spawned().
+
+        :param change: A change dictionary from DataWatcher.poll().
+        """
+        by_id = {monster["id"]: monster for monster in self.monster_db}
+        for monster_id, (old, new) in change["changed"].items():
+            if monster_id in by_id:
+                patch_record(by_id[monster_id], old, new)
+        self.monster_db[:] = [monster for monster in self.monster_db if monster["id"] not in change["removed"]]
+        self.monster_db.extend(dict(monster) for monster in change["added"].values())
+        self._buckets.clear()
+        self._room_tables.clear()
+        self.scaler.clear()
+
+    def patch_spawned(self, monsters, change):
+        """
+        Patch spawned monsters in place with an edited monsters file.
+
+        Only stats the run has not changed are updated, so a monster keeps its remaining health.
+
+        :param monsters: The spawned monster dictionaries.
+        :param change: A change dictionary from DataWatcher.poll().
+        """
+        for monster in monsters:
+            edit = change["changed"].get(monster["id"])
+            if edit is not None:
+                old, new = edit
+                patch_record(monster, self.scaler.scale(old, monster["floor"]), self.scaler.scale(new, monster["floor"]))
+
     def _filter_monsters_by_danger_level(self, danger_level):
         """
         Filter monsters from the database based on their danger level.
@@ -30,35 +122,180 @@ class FloorGenerator:
         """
         return [monster for monster in self.monster_db if monster["danger_level"] == danger_level]
 
-    def generate_floor(self):
+    def _room_table(self, danger_level, max_count):
+        """
+        Get the table of _room_table_steps(), building it at once if it is not built yet.
+
+        :param danger_level: The danger level of the room.
+        :param max_count: The largest room size.
+        :return: A (buckets, weights, reachable, weight_mask, fitting) tuple, or None if there are no such monsters.
         """
-        Generate a floor with three rooms:
+        return _finish(self._room_table_steps(danger_level, max_count))
+
+    def _room_table_steps(self, danger_level, max_count):
+        """
+        Get the difficulty buckets of a danger level and the room totals they can add up to.
+
+        Monsters are grouped by their difficulty, quantized to DIFFICULTY_LEVELS steps, so the
+        table's size depends on the number of distinct steps rather than the number of monsters.
+        For every room size k, reachable[k] is a bitset whose bit t is set if k monsters can
+        add up to exactly t steps, and bit (largest weight - w) of weight_mask is set for every
+        weight w. fitting caches the weights that can be drawn for each such window of bits.
+        The buckets are built once per danger level and the table once per room size, yielding
+        after every chunk of monsters scored and every room size so that a horde's table can be
+        spread across frames.
+
+        :param danger_level: The danger level of the room.
+        :param max_count: The largest room size.
+        :return: A generator whose return value is a (buckets, weights, reachable, weight_mask,
+                 fitting) tuple, or None if there are no such monsters.
+        """
+        key = (danger_level, max_count)
+        table = self._room_tables.get(key)
+        if table is None:
+            grouped = self._buckets.get(danger_level)
+            if grouped is None:
+                monsters = self._filter_monsters_by_danger_level(danger_level)
+                if not monsters:
+                    return None
+                scores = []
+                for start in range(0, len(monsters), SCORE_CHUNK):
+                    scores.extend(monster_difficulty(monster) for monster in monsters[start:start + SCORE_CHUNK])
+                    yield
+                unit = max(scores) / DIFFICULTY_LEVELS or 1
+                buckets = {}
+                for start in range(0, len(monsters), SCORE_CHUNK):
+                    for monster, score in zip(monsters[start:start + SCORE_CHUNK], scores[start:start + SCORE_CHUNK]):
+                        buckets.setdefault(max(1, round(score / unit)), []).append(monster)
+                    yield
+                grouped = self._buckets[danger_level] = (buckets, sorted(buckets))
+            buckets, weights = grouped
+
+            reachable = [1]
+            for _ in range(max_count):
+                previous, bits = reachable[-1], 0
+                for weight in weights:
+                    bits |= previous << weight
+                reachable.append(bits)
+                yield
+            weight_mask = sum(1 << (weights[-1] - weight) for weight in weights)
+            table = self._room_tables[key] = (buckets, weights, reachable, weight_mask, {})
+        return table
+
+    def compose_room(self, danger_level, min_count, max_count, budget_fraction, rng=None):
+        """
+        Fill a room with monsters whose combined difficulty matches a budget.
+
+        The budget is a fraction of the way from the easiest possible room (min_count of the
+        weakest monsters) to the hardest one (max_count of the strongest). The room size and
+        total closest to the budget are picked from the reachable totals, then the monsters
+        are drawn backwards through the table so that every draw keeps the total reachable.
+
+        :param danger_level: The danger level of the room's monsters.
+        :param min_count: The smallest room size.
+        :param max_count: The largest room size.
+        :param budget_fraction: How hard the room should be, from 0.0 to 1.0.
+        :param rng: Optional random.Random instance to draw from instead of the generator's own.
+        :return: A list of monster dictionaries.
+        """
+        rng = rng or self.rng
+        table = self._room_table(danger_level, max_count)
+        if table is None:
+            raise ValueError(f"No monsters found in the database with danger_level = {danger_level}!")
+        buckets, weights, reachable, weight_mask, fitting = table
+
+        # Aim for the budget, give or take a little so floors of the same depth still vary
+        low, high = min_count * weights[0], max_count * weights[-1]
+        fraction = budget_fraction + rng.uniform(-BUDGET_JITTER, BUDGET_JITTER)
+        target = round(low + (high - low) * min(1.0, max(0.0, fraction)))
+
+        # Find the reachable total nearest to the target, over every allowed room size
+        allowed = 0
+        for count in range(min_count, max_count + 1):
+            allowed |= reachable[count]
+        for distance in range(high + 1):
+            if distance <= target and allowed >> (target - distance) & 1:
+                total = target - distance
+                break
+            if allowed >> (target + distance) & 1:
+                total = target + distance
+                break
+        count = rng.choice([count for count in range(min_count, max_count + 1) if reachable[count] >> total & 1])
+
+        # Draw the monsters, each time from a bucket that leaves the rest of the total reachable.
+        # One shift lines the totals left monsters can reach up with weight_mask, so bit
+        # (top - w) of fits is set if drawing weight w keeps the rest reachable
+        top = weights[-1]
+        room = []
+        remaining = total
+        for left in range(count - 1, -1, -1):
+            shift = remaining - top
+            fits = (reachable[left] >> shift if shift >= 0 else reachable[left] << -shift) & weight_mask
+            choices = fitting.get(fits)
+            if choices is None:
+                choices = fitting[fits] = [weight for weight in weights if fits >> (top - weight) & 1]
+            weight = rng.choice(choices)
+            room.append(rng.choice(buckets[weight]))
+            remaining -= weight
+        return room
+
+    def generate_floor(self, floor_number=1, rng=None):
+        """
+        Generate a floor with three rooms, each filled up to the floor's difficulty budget:
         - Room A: 2–5 normal monsters (danger_level = 1).
         - Room B: 2–3 elite monsters (danger_level = 2).
+        - Horde: on every HORDE_FLOOR_INTERVAL-th floor, a horde of normal monsters that all attack at once.
         - Room C: 1 boss monster (danger_level = 3).
 
+        :param floor_number: The floor's number, which sets its difficulty budget.
+        :param rng: Optional random.Random instance to draw the floor from instead of the generator's own.
         :return: A dictionary representing the floor with room details.
         """
+        return _finish(self.generate_floor_steps(floor_number, rng))
+
+    def generate_floor_steps(self, floor_number=1, rng=None):
+        """
+        Generate a floor one room at a time, yielding between rooms so the work
+        can be spread across frames by the FrameScheduler.
+
+        :param floor_number: The floor's number, which sets its difficulty budget.
+        :param rng: Optional random.Random instance to draw the floor from instead of the generator's own.
+        :return: A generator whose return value is the floor dictionary.
+        """
+        budget = floor_budget(floor_number)
+
         # Select 2–5 normal monsters for Room A
-        normal_monsters = self._filter_monsters_by_danger_level(1)
-        room_a = random.choices(normal_monsters, k=random.randint(2, 5))
+        yield from self._room_table_steps(1, 5)
+        room_a = self.compose_room(1, 2, 5, budget, rng)
+        yield
 
         # Select 2–3 elite monsters for Room B
-        elite_monsters = self._filter_monsters_by_danger_level(2)
-        room_b = random.choices(elite_monsters, k=random.randint(2, 3))
+        yield from self._room_table_steps(2, 3)
+        room_b = self.compose_room(2, 2, 3, budget, rng)
+        yield
+
+        # Select a horde of normal monsters on every few floors
+        horde = None
+        if floor_number % HORDE_FLOOR_INTERVAL == 0:
+            yield from self._room_table_steps(1, HORDE_MAX_SIZE)
+            horde = self.compose_room(1, HORDE_MIN_SIZE, HORDE_MAX_SIZE, budget, rng)
+            yield
 
         # Select 1 boss monster for Room C
-        boss_monsters = self._filter_monsters_by_danger_level(3)
-        if not boss_monsters:
+        if (yield from self._room_table_steps(3, 1)) is None:
             raise ValueError("No boss monsters found in the database! Ensure there are monsters with danger_level = 3.")
-        room_c = [random.choice(boss_monsters)]
+        room_c = self.compose_room(3, 1, 1, budget, rng)
 
-        # Return the floor structure
-        return {
-            "Room A": room_a,
-            "Room B": room_b,
-            "Room C": room_c
+        # Spawn the monsters with the floor's stats, each with health of its own
+        spawn = self.scaler.spawn
+        floor = {
+            "Room A": [spawn(monster, floor_number) for monster in room_a],
+            "Room B": [spawn(monster, floor_number) for monster in room_b],
         }
+        if horde is not None:
+            floor[HORDE_ROOM] = [spawn(monster, floor_number) for monster in horde]
+        floor["Room C"] = [spawn(monster, floor_number) for monster in room_c]
+        return floor
 
 # Example usage
 if __name__ == "__main__":
@@ -69,11 +306,11 @@ if __name__ == "__main__":
     generator = FloorGenerator(monster_db_path)
 
     # Generate a floor
-    floor = generator.generate_floor()
+    floor = generator.generate_floor(1)
 
     # Print the floor details
     print("Generated Floor:")
     for room, monsters in floor.items():
         print(f"{room}:")
         for monster in monsters:
-            print(f"  - {monster['name']} (Danger Level: {monster['danger_level']})")
\ No newline at end of file
+            print(f"  - {monster['name']} (Danger Level: {monster['danger_level']}, Health: {monster['health']})")
\ No newline at end of file
@@ -0,0 +1,60 @@
+from collections import namedtuple
+from combat_rules import turn_outcomes
+
+# An immutable snapshot of the PvE game's turn-by-turn state against one enemy.
+# Forks share every field they do not change with the state they came from: the
+# floor, monster and move dictionaries and the RNG state are referenced rather than
+# copied, and the combat log is kept as a length because it is only appended to
+# while an enemy is fought, so a fork costs only the fields a turn actually changes.
+GameState = namedtuple("GameState", [
+    "player_health",
+    "floor_number",
+    "room",
+    "enemy_index",
+    "enemy_health",  # Health of the enemy at enemy_index
+    "turn_state",
+    "enemy_move",
+    "enemy_move_index",  # Index of enemy_move in the enemy's attacks
+    "player_move",
+    "show_rewards_popup",
+    "log_length",  # Number of combat log entries
+    "rng_state",  # random.Random.getstate() of the game's combat stream
+    "turns_pending",  # Number of resolved turns that undo can still take back (see MainGameLoop.pending_turns)
+])
+
+def apply_turn(state, dealt, taken):
+    """
+    Fork a state with one turn's damage applied to the player and the current enemy.
+
+    The result follows MainGameLoop.resolve_combat: the rewards pop-up opens when the
+    enemy dies, and the game is over when the player's health drops to zero.
+
+    :param state: The GameState before the turn.
+    :param dealt: Damage dealt to the current enemy.
+    :param taken: Damage taken by the player, after armor.
+    :return: A new GameState.
+    """
+    enemy_hp = state.enemy_health - dealt
+    player_hp = state.player_health - taken
+    return state._replace(
+        player_health=player_hp,
+        enemy_health=enemy_hp,
+        turn_state="game_over" if player_hp <= 0 else "enemy_turn",
+        enemy_move=None,
+        enemy_move_index=None,
+        player_move=None,
+        show_rewards_popup=enemy_hp <= 0,
+    )
+
+def fork_turn(state, player_move, enemy_move, armor_rating):
+    """
+    Fork a state into every possible result of one turn, for lookahead and previews.
+
+    :param state: The GameState before the turn.
+    :param player_move: The player's move dictionary.
+    :param enemy_move: The enemy's move dictionary.
+    :param armor_rating: The player's armor rating.
+    :return: A list of (probability, GameState) tuples.
+    """
+    return [(p, apply_turn(state, dealt, taken))
+            for p, dealt, taken in turn_outcomes(player_move, enemy_move, armor_rating)]
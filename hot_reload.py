@@ -0,0 +1,134 @@
+import json
+import os
+import time
+from pathlib import Path
+
+# Environment variable naming the data directory to watch while the game runs
+HOT_RELOAD_DIR_ENV = "LONER_HOT_RELOAD"
+
+def diff_records(old_records, new_records):
+    """
+    Compare two versions of a data file by record id.
+
+    :param old_records: The previously loaded list of records.
+    :param new_records: The newly loaded list of records.
+    :return: A dictionary with added ({id: record}), changed ({id: (old, new)}) and removed ({id: record}).
+    """
+    old_by_id = {record["id"]: record for record in old_records}
+    new_by_id = {record["id"]: record for record in new_records}
+    return {
+        "added": {record_id: record for record_id, record in new_by_id.items() if record_id not in old_by_id},
+        "changed": {record_id: (old_by_id[record_id], record) for record_id, record in new_by_id.items()
+                    if record_id in old_by_id and old_by_id[record_id] != record},
+        "removed": {record_id: record for record_id, record in old_by_id.items() if record_id not in new_by_id},
+    }
+
+def patch_record(target, old, new):
+    """
+    Patch a live record in place with the edits made between two versions of its data.
+
+    Only fields the game has not changed since loading are updated, so run state such
+    as an enemy's remaining health survives the reload.
+
+    :param target: The live record dictionary.
+    :param old: The record as previously loaded from the file.
+    :param new: The record as now loaded from the file.
+    """
+    for key, value in new.items():
+        if key not in target or target[key] == old.get(key):
+            target[key] = value
+    for key in old.keys() - new.keys():
+        if key in target and target[key] == old[key]:
+            del target[key]
+
+class DataWatcher:
+    def __init__(self, directory="data", interval=0.25):
+        """
+        Initialize a watcher that reloads the JSON data files when they change on disk.
+
+        Files are checked by modification time, and only the ones that changed are
+        parsed again and compared with their previous version by record id.
+
+        :param directory: Directory holding the *.json data files.
+        :param interval: Seconds between checks.
+        """
+        self.directory = Path(directory)
+        self.interval = interval
+        self._clock = time.perf_counter
+        self._next_check = 0.0
+        self._mtimes = {}
+        self._records = {}
+        for path in sorted(self.directory.glob("*.json")):
+            self._mtimes[path] = path.stat().st_mtime_ns
+            self._records[path] = self._load(path) or []
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create a watcher if the player opted in through the environment.
+
+        :return: A DataWatcher instance, or None if hot reload is disabled.
+        """
+        directory = os.environ.get(HOT_RELOAD_DIR_ENV)
+        if not directory:
+            return None
+        return cls(directory)
+
+    def _load(self, path):
+        """
+        Parse a data file, keeping the previous version if it is mid-edit or invalid.
+
+        :param path: Path to the JSON file.
+        :return: The list of records, or None if the file could not be parsed.
+        """
+        try:
+            with open(path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError) as error:
+            print(f"Hot reload: skipped {path.name}: {error}")
+            return None
+
+    def poll(self):
+        """
+        Check the data files and reload the ones that changed since the last check.
+
+        :return: A list of change dictionaries, one per reloaded file, each with the file's
+                 name (such as "monsters"), its new records and the diff from diff_records().
+        """
+        now = self._clock()
+        if now < self._next_check:
+            return []
+        self._next_check = now + self.interval
+
+        changes = []
+        for path in self.directory.glob("*.json"):
+            try:
+                mtime = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            if self._mtimes.get(path) == mtime:
+                continue
+            self._mtimes[path] = mtime
+
+            started = self._clock()
+            records = self._load(path)
+            if records is None:
+                continue
+            change = diff_records(self._records.get(path, []), records)
+            self._records[path] = records
+            if not (change["added"] or change["changed"] or change["removed"]):
+                continue
+            change["name"] = path.stem
+            change["records"] = records
+            changes.append(change)
+            print(f"Hot reload: {path.name} - {len(change['changed'])} changed, {len(change['added'])} added, "
+                  f"{len(change['removed'])} removed ({(self._clock() - started) * 1000:.1f} ms)")
+        return changes
+
+# Example usage
+if __name__ == "__main__":
+    watcher = DataWatcher("data")
+    print("Watching data/*.json for changes (Ctrl+C to stop)...")
+    while True:
+        watcher.poll()
+        time.sleep(watcher.interval)
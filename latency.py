@@ -0,0 +1,62 @@
+from collections import deque
+from telemetry import LATENCY
+
+class LatencyTracker:
+    def __init__(self, max_samples=1000, telemetry=None):
+        """
+        Initialize a tracker for the delay between an input and the flip that shows its result.
+
+        :param max_samples: Number of recent samples kept for the statistics, or None to keep every sample.
+        :param telemetry: Optional Telemetry sink that records every sample.
+        """
+        self.samples = deque(maxlen=max_samples)
+        self.telemetry = telemetry
+        self._pending = []
+
+    def input_received(self, timestamp):
+        """
+        Register an input that the next flip will answer.
+
+        :param timestamp: The time.perf_counter() value at which the input was received.
+        """
+        self._pending.append(timestamp)
+
+    def frame_presented(self, timestamp):
+        """
+        Close the samples of every input handled in the frame that was just flipped.
+
+        :param timestamp: The time.perf_counter() value right after the flip.
+        """
+        if not self._pending:
+            return
+        for received in self._pending:
+            latency_ms = (timestamp - received) * 1000
+            self.samples.append(latency_ms)
+            if self.telemetry:
+                self.telemetry.record(LATENCY, latency_ms)
+        self._pending.clear()
+
+    def percentile(self, fraction):
+        """
+        Get a percentile of the recent samples.
+
+        :param fraction: The percentile as a fraction (0.5 for the median).
+        :return: The latency in milliseconds, or None without samples.
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def stats(self):
+        """
+        Summarize the recent samples.
+
+        :return: A dictionary with count, p50, p99 and max in milliseconds.
+        """
+        return {
+            "count": len(self.samples),
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "max": max(self.samples) if self.samples else None,
+        }
@@ -0,0 +1,94 @@
+import pygame
+from run_history import build_key
+from scene_manager import Scene
+
+# Constants
+FONT = 36
+SMALL_FONT = 24
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+YELLOW = (255, 255, 0)
+GRAY = (128, 128, 128)
+
+# UI Constants
+UI_PADDING = 20
+
+class LeaderboardScreen(Scene):
+    caption = "Leaderboard"
+
+    def __init__(self, run_history, character=None, limit=10):
+        """
+        Initialize the leaderboard screen.
+
+        :param run_history: The RunHistory to read from.
+        :param character: Optional character profile whose build's best runs are shown.
+        :param limit: Number of runs listed.
+        """
+        self.run_history = run_history
+        self.character = character
+        self.limit = limit
+        self.top_runs = []
+        self.build_runs = []
+        self.deadliest = []
+
+    def on_enter(self):
+        """
+        Load the leaderboard once when the screen opens; every query is served by an index.
+        """
+        self.top_runs = self.run_history.top_runs(self.limit)
+        self.deadliest = self.run_history.deadliest_monsters(3)
+        if self.character is not None:
+            self.build_runs = self.run_history.top_runs_for_build(build_key(self.character), 3)
+
+    def draw_text(self, text, x, y, color=WHITE, font=FONT):
+        """
+        Draw text on the screen.
+
+        :param text: The text to display.
+        :param x: Logical X position of the text.
+        :param y: Logical Y position of the text.
+        :param color: Color of the text.
+        :param font: Size of the shared font to use for the text.
+        """
+        self.manager.draw_text(text, x, y, color, font)
+
+    def handle_event(self, event):
+        """
+        Return to the previous screen on ENTER or ESCAPE.
+
+        :param event: The Pygame event to handle.
+        """
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_ESCAPE):
+            self.manager.pop()
+
+    def draw(self):
+        """
+        Draw the leaderboard.
+        """
+        self.screen.fill(BLACK)
+        self.draw_text("Leaderboard", UI_PADDING, 20, WHITE)
+
+        y = 70
+        if not self.top_runs:
+            self.draw_text("No runs recorded yet.", UI_PADDING, y, GRAY, SMALL_FONT)
+        for rank, run in enumerate(self.top_runs, start=1):
+            self.draw_text(f"{rank}. Floor {run['floor_reached']} - {run['kills']} kills - {run['build']}", UI_PADDING, y, WHITE, SMALL_FONT)
+            y += 24
+
+        if self.build_runs:
+            y += 16
+            self.draw_text("Best with your build:", UI_PADDING, y, YELLOW, SMALL_FONT)
+            y += 24
+            for run in self.build_runs:
+                self.draw_text(f"- Floor {run['floor_reached']} - {run['kills']} kills ({run['outcome']})", UI_PADDING, y, WHITE, SMALL_FONT)
+                y += 24
+
+        if self.deadliest:
+            y += 16
+            self.draw_text("Deadliest monsters:", UI_PADDING, y, YELLOW, SMALL_FONT)
+            y += 24
+            for monster in self.deadliest:
+                self.draw_text(f"- {monster['name']}: {monster['deaths']} runs ended", UI_PADDING, y, WHITE, SMALL_FONT)
+                y += 24
+
+        self.draw_text("Press ENTER to go back", UI_PADDING, 560, YELLOW, SMALL_FONT)
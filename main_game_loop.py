@@ -1,17 +1,28 @@
 import pygame
 import json
+import hashlib
 import random
+from collections import deque
 from pathlib import Path
-from floor_generator import FloorGenerator
+from autopilot import Autopilot
+from combat_rules import (
+    NEUTRAL, NEUTRAL_FLINCH_CHANCE, NEUTRAL_MULTIPLIER, SUPERIOR, SUPERIOR_MULTIPLIER, TYPE_CODES,
+    WEAK, WEAK_ENEMY_MULTIPLIER, WEAK_MULTIPLIER, damage_taken, kill_chance, move_preview, rps_outcome,
+)
+from floor_generator import FloorGenerator, HORDE_ROOM
+from game_state import GameState, fork_turn
+from hot_reload import patch_record
+from replay import ReplayRecorder
+from scene_manager import Scene, SceneManager, SCREEN_WIDTH, SCREEN_HEIGHT
+from stats_screen import StatsScreen
+from telemetry import COMBAT, FLOOR, LOOT, UNDO, Telemetry
 
 # Initialize Pygame
 pygame.init()
 
 # Constants
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-FONT = pygame.font.Font(None, 36)
-SMALL_FONT = pygame.font.Font(None, 24)
+FONT = 36
+SMALL_FONT = 24
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 HIGHLIGHT = (200, 200, 0)
@@ -21,22 +32,47 @@ BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
 GRAY = (128, 128, 128)
 
+# Character profile slot filled from each data file
+PROFILE_SLOTS = {"ascendances": "ascendancy", "weapons": "weapon", "armors": "armor", "spells": "spell"}
+
 # UI Constants
 UI_PADDING = 20
 UI_SECTION_WIDTH = (SCREEN_WIDTH - 3 * UI_PADDING) // 2
 UI_SECTION_HEIGHT = SCREEN_HEIGHT - 2 * UI_PADDING
+PORTRAIT_SIZE = 64
+
+# Share of its attack's damage that each horde monster waiting behind the one being fought deals
+HORDE_DAMAGE_SHARE = 0.02
+
+# Positions the autopilot visits per decision; a fixed count rather than a time budget
+# keeps seeded games and replays reproducible on any machine. Over an auto-battle run
+# to floor 15 it kept decisions at a p99 of 1 ms and a worst case of about 1.5 ms
+AUTOPILOT_NODES = 300
+
+# Number of turns that can be undone against the current enemy
+UNDO_DEPTH = 20
 
-class MainGameLoop:
-    def __init__(self, character_profile_path, monster_db_path):
+class MainGameLoop(Scene):
+    caption = "Turn-Based RPG"
+
+    def __init__(self, character_profile_path, monster_db_path, telemetry=None, seed=None, recorder=None, run_history=None,
+                 combat_stats=None):
         """
         Initialize the Main Game Loop.
 
         :param character_profile_path: Path to the character profile JSON file.
         :param monster_db_path: Path to the monster database JSON file.
-        """
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Turn-Based RPG")
-        self.clock = pygame.time.Clock()
+        :param telemetry: Optional Telemetry sink that records gameplay events.
+        :param seed: Seed for all of the game's randomness (a random seed is picked if omitted).
+        :param recorder: Optional ReplayRecorder that captures the seed and player input.
+        :param run_history: Optional RunHistory that stores a summary of every finished run.
+        :param combat_stats: Optional CombatStats that counts matchups, attacks and fights per run and over all runs.
+        """
+        # Seed the game's random streams; every floor is drawn from a stream of its own
+        # (see floor_rng), so background floor generation never shifts any other rolls
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.run_number = 0  # Runs started with this seed, so every restart gets new floors
 
         # Load character profile
         self.character = self._load_json(character_profile_path)
@@ -44,19 +80,34 @@ class MainGameLoop:
 
         # Load monster database and generate a floor
         self.floor_generator = FloorGenerator(monster_db_path)
-        self.current_floor = self.floor_generator.generate_floor()
         self.current_floor_number = 1
-        self.current_room = "Room A"
-        self.current_enemies = self.current_floor[self.current_room]
-        self.current_enemy_index = 0
-        self.current_enemy = self.current_enemies[self.current_enemy_index]
+        self.current_floor = self.floor_generator.generate_floor(self.current_floor_number, self.floor_rng(self.current_floor_number))
+        self.horde_table = None  # EntityTable, created once the first horde room is reached
+        self.undo_stack = deque(maxlen=UNDO_DEPTH)  # GameState snapshots taken as moves are locked in
+        self.pending_turns = []  # Resolved turns that can still be undone, taken back out of the stats by restore()
+        self.enter_room("Room A")
         self.enemy_move = None
+        self.enemy_move_index = None  # Index of enemy_move in the enemy's attacks
         self.player_move = None
+        self.previewed_move = None  # (move index, GameState) of the move last previewed with P
         self.combat_log = []
         self.turn_state = "enemy_turn"  # States: enemy_turn, player_turn, resolve_turn, game_over
         self.show_rewards_popup = False
         self.show_game_over_popup = False
         self.rewards = []
+        self.selected_index = 0
+        self.telemetry = telemetry
+        self.next_floor_task = None  # Background generation of the next floor
+        self.next_floor_key = None  # (run number, floor number) the background generation is for
+        self.frame = 0  # Number of updates so far, used to line up replayed input
+        self.autopilot = None  # Set while auto-battle plays the turns
+        self.run_history = run_history
+        self.combat_stats = combat_stats
+        self.monster_db_path = monster_db_path
+        self.start_run_stats()
+        self.recorder = recorder
+        if self.recorder:
+            self.recorder.begin(self.seed, self.character, monster_db_path)
 
     def _load_json(self, path):
         """
@@ -113,13 +164,12 @@ class MainGameLoop:
         Draw text on the screen.
 
         :param text: The text to display.
-        :param x: X position of the text.
-        :param y: Y position of the text.
+        :param x: Logical X position of the text.
+        :param y: Logical Y position of the text.
         :param color: Color of the text.
-        :param font: Font to use for the text.
+        :param font: Size of the shared font to use for the text.
         """
-        text_surface = font.render(text, True, color)
-        self.screen.blit(text_surface, (x, y))
+        self.manager.draw_text(text, x, y, color, font)
 
     def draw_combat_log(self):
         """
@@ -152,6 +202,10 @@ class MainGameLoop:
         self.draw_text(f"Health: {self.current_enemy['health']}", UI_PADDING, 90, GREEN, SMALL_FONT)
         self.draw_text(f"Type: {self.current_enemy['type']}", UI_PADDING, 120, WHITE, SMALL_FONT)
         self.draw_text(f"Weakness: {self.current_enemy['weakness']}", UI_PADDING, 150, WHITE, SMALL_FONT)
+        if self.horde is not None:
+            self.draw_text(f"Horde: {self.horde.living(self.current_enemy_index + 1)} more", UI_PADDING, 180, RED, SMALL_FONT)
+        self.manager.assets.draw(self.manager.viewport, self.screen, "monsters", self.current_enemy["id"],
+                                 UI_PADDING + 200, 60, PORTRAIT_SIZE, PORTRAIT_SIZE)
 
     def draw_floor_info(self):
         """
@@ -170,10 +224,20 @@ class MainGameLoop:
         :param selected_index: The index of the currently selected item.
         """
         self.draw_text(title, UI_PADDING, 250, WHITE)
+        self.draw_text("Deal", UI_PADDING + 340, 255, GRAY, SMALL_FONT)
+        self.draw_text("Take", UI_PADDING + 410, 255, GRAY, SMALL_FONT)
+        self.draw_text("Kill", UI_PADDING + 480, 255, GRAY, SMALL_FONT)
+        kill_chances = self.move_kill_chances()
         for i, item in enumerate(items):
             color = HIGHLIGHT if i == selected_index else WHITE
             self.draw_text(f"{i + 1}. {item['name']} ({item['type']}) - {item['damage']} DMG", UI_PADDING, 280 + i * 30, color, SMALL_FONT)
 
+            # Expected results against the enemy's attack pool
+            preview = self.move_previews[i]
+            self.draw_text(f"{preview['dealt']:.1f}", UI_PADDING + 340, 280 + i * 30, color, SMALL_FONT)
+            self.draw_text(f"{preview['taken']:.1f}", UI_PADDING + 410, 280 + i * 30, color, SMALL_FONT)
+            self.draw_text(f"{kill_chances[i]:.0%}", UI_PADDING + 480, 280 + i * 30, color, SMALL_FONT)
+
     def draw_prompt(self):
         """
         Draw a prompt to guide the player on what to do.
@@ -181,26 +245,25 @@ class MainGameLoop:
         if self.turn_state == "enemy_turn":
             self.draw_text("Enemy is choosing a move...", UI_PADDING, 350, YELLOW, SMALL_FONT)
         elif self.turn_state == "player_turn":
-            self.draw_text("Choose your move (UP/DOWN to select, ENTER to confirm):", UI_PADDING, 350, YELLOW, SMALL_FONT)
+            self.draw_text("Choose your move (UP/DOWN, ENTER, A: auto-battle, BACKSPACE: undo, P: preview, S: stats):", UI_PADDING, 350, YELLOW, SMALL_FONT)
         elif self.turn_state == "resolve_turn":
-            self.draw_text("Press ENTER to resolve the turn...", UI_PADDING, 350, YELLOW, SMALL_FONT)
+            self.draw_text("Press ENTER to resolve the turn (BACKSPACE to undo)...", UI_PADDING, 350, YELLOW, SMALL_FONT)
 
     def draw_rewards_popup(self):
         """
         Draw a pop-up window displaying the rewards for defeating the enemy.
         """
         # Darken the background
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.manager.viewport.overlay((0, 0, 0, 128)), (0, 0))
 
         # Draw the pop-up window
         popup_width = 400
         popup_height = 300
         popup_x = (SCREEN_WIDTH - popup_width) // 2
         popup_y = (SCREEN_HEIGHT - popup_height) // 2
-        pygame.draw.rect(self.screen, BLACK, (popup_x, popup_y, popup_width, popup_height))
-        pygame.draw.rect(self.screen, WHITE, (popup_x, popup_y, popup_width, popup_height), 2)
+        viewport = self.manager.viewport
+        pygame.draw.rect(self.screen, BLACK, viewport.rect(popup_x, popup_y, popup_width, popup_height))
+        pygame.draw.rect(self.screen, WHITE, viewport.rect(popup_x, popup_y, popup_width, popup_height), viewport.length(2))
 
         # Draw the title
         self.draw_text("Victory!", popup_x + 20, popup_y + 20, WHITE)
@@ -220,17 +283,16 @@ class MainGameLoop:
         Draw a pop-up window for the game over screen.
         """
         # Darken the background
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.manager.viewport.overlay((0, 0, 0, 128)), (0, 0))
 
         # Draw the pop-up window
         popup_width = 400
         popup_height = 300
         popup_x = (SCREEN_WIDTH - popup_width) // 2
         popup_y = (SCREEN_HEIGHT - popup_height) // 2
-        pygame.draw.rect(self.screen, BLACK, (popup_x, popup_y, popup_width, popup_height))
-        pygame.draw.rect(self.screen, WHITE, (popup_x, popup_y, popup_width, popup_height), 2)
+        viewport = self.manager.viewport
+        pygame.draw.rect(self.screen, BLACK, viewport.rect(popup_x, popup_y, popup_width, popup_height))
+        pygame.draw.rect(self.screen, WHITE, viewport.rect(popup_x, popup_y, popup_width, popup_height), viewport.length(2))
 
         # Draw the title
         self.draw_text("Game Over!", popup_x + 20, popup_y + 20, RED)
@@ -240,69 +302,375 @@ class MainGameLoop:
         self.draw_text("Press UP ARROW to restart", popup_x + 20, popup_y + 120, WHITE, SMALL_FONT)
         self.draw_text("Press DOWN ARROW to quit", popup_x + 20, popup_y + 160, WHITE, SMALL_FONT)
 
+    def handle_event(self, event):
+        """
+        Handle a Pygame event for the current turn state.
+
+        :param event: The Pygame event to handle.
+        """
+        if event.type != pygame.KEYDOWN:
+            return
+
+        if self.recorder:
+            self.recorder.record(self.frame, event.key)
+
+        if event.key == pygame.K_a and self.turn_state != "game_over":
+            self.toggle_auto_battle()
+        elif self.show_rewards_popup:
+            if event.key == pygame.K_RETURN:
+                self.close_rewards_popup()
+        elif event.key == pygame.K_BACKSPACE and self.turn_state in ("player_turn", "resolve_turn"):
+            self.undo()
+        elif event.key == pygame.K_s and self.combat_stats and self.manager is not None:
+            self.manager.push(StatsScreen(self.combat_stats, self.monster_db_path))
+        elif self.turn_state == "player_turn":
+            if event.key == pygame.K_UP:
+                self.selected_index = (self.selected_index - 1) % len(self.player_stats["moves"])
+            elif event.key == pygame.K_DOWN:
+                self.selected_index = (self.selected_index + 1) % len(self.player_stats["moves"])
+            elif event.key == pygame.K_RETURN:
+                self.confirm_move(self.selected_index)
+            elif event.key == pygame.K_p:
+                self.previewed_move = (self.selected_index, self.preview_move(self.selected_index))
+        elif self.turn_state == "resolve_turn" and event.key == pygame.K_RETURN:
+            self.resolve_combat()
+            self.selected_index = 0  # Reset selection for the next turn
+        elif self.turn_state == "game_over":
+            if event.key == pygame.K_UP:  # Restart the game
+                self.reset_game()
+            elif event.key == pygame.K_DOWN:  # Quit the game
+                if self.manager is not None:
+                    self.manager.pop()
+
+    def confirm_move(self, index):
+        """
+        Lock in the player's move for this turn.
+
+        :param index: Index of the move in player_stats["moves"].
+        """
+        if self.horde is None:
+            # The horde's arrays are not part of a snapshot, so horde turns cannot be undone
+            self.undo_stack.append(self.snapshot())
+        self.player_move = self.player_stats["moves"][index]
+        self.previewed_move = None
+        self.combat_log.append(f"You use {self.player_move['name']} ({self.player_move['type']})!")
+        self.turn_state = "resolve_turn"
+
+    def snapshot(self):
+        """
+        Capture the turn-by-turn state of the current room as an immutable GameState.
+
+        :return: A GameState.
+        """
+        return GameState(
+            player_health=self.player_stats["health"],
+            floor_number=self.current_floor_number,
+            room=self.current_room,
+            enemy_index=self.current_enemy_index,
+            enemy_health=self.current_enemy["health"],
+            turn_state=self.turn_state,
+            enemy_move=self.enemy_move,
+            enemy_move_index=self.enemy_move_index,
+            player_move=self.player_move,
+            show_rewards_popup=self.show_rewards_popup,
+            log_length=len(self.combat_log),
+            rng_state=self.rng.getstate(),
+            turns_pending=len(self.pending_turns),
+        )
+
+    def restore(self, state):
+        """
+        Put the game back into a state captured by snapshot() against the current enemy.
+
+        :param state: A GameState of the current floor, room and enemy.
+        """
+        if (state.floor_number, state.room, state.enemy_index) != (self.current_floor_number, self.current_room,
+                                                                   self.current_enemy_index):
+            raise ValueError(f"Cannot restore a state of floor {state.floor_number}, {state.room}, enemy "
+                             f"{state.enemy_index} on floor {self.current_floor_number}, {self.current_room}, "
+                             f"enemy {self.current_enemy_index}.")
+        self.player_stats["health"] = state.player_health
+        self.current_enemy["health"] = state.enemy_health
+        self.turn_state = state.turn_state
+        self.enemy_move = state.enemy_move
+        self.enemy_move_index = state.enemy_move_index
+        self.player_move = state.player_move
+        self.show_rewards_popup = state.show_rewards_popup
+        del self.combat_log[state.log_length:]
+        self.previewed_move = None
+        self.rng.setstate(state.rng_state)
+
+        # Take the undone turns back out of the stats
+        undone = self.pending_turns[state.turns_pending:]
+        for turn in undone:
+            self.record_turn(turn, -1)
+        del self.pending_turns[state.turns_pending:]
+        if undone and self.telemetry:
+            self.telemetry.record(UNDO, self.current_floor_number, self.current_enemy["id"], len(undone))
+
+    def undo(self):
+        """
+        Take back the last move locked in against the current enemy.
+        """
+        if not self.undo_stack:
+            self.combat_log.append("Nothing to undo.")
+            return
+        self.restore(self.undo_stack.pop())
+        self.selected_index = 0
+
+    def preview_move(self, index):
+        """
+        Work out the most likely result of a move against the enemy's announced move,
+        on a fork of the game state that leaves the live game untouched.
+
+        :param index: Index of the move in player_stats["moves"].
+        :return: The GameState after the turn.
+        """
+        outcomes = fork_turn(self.snapshot(), self.player_stats["moves"][index], self.enemy_move,
+                             self.player_stats["armor_rating"])
+        return max(outcomes, key=lambda outcome: outcome[0])[1]
+
+    def draw_previewed_move(self):
+        """
+        Draw the result of the move previewed with P, while it is still the selected move.
+        """
+        if self.previewed_move is None or self.previewed_move[0] != self.selected_index:
+            return
+        move = self.player_stats["moves"][self.selected_index]
+        state = self.previewed_move[1]
+        self.draw_text(f"If you use {move['name']}:", SCREEN_WIDTH // 1.35 + UI_PADDING, 250, YELLOW, SMALL_FONT)
+        self.draw_text(f"You: {state.player_health:g} HP", SCREEN_WIDTH // 1.35 + UI_PADDING, 280, GREEN, SMALL_FONT)
+        self.draw_text(f"Enemy: {max(state.enemy_health, 0):g} HP", SCREEN_WIDTH // 1.35 + UI_PADDING, 310, GREEN, SMALL_FONT)
+
+    def refresh_move_previews(self):
+        """
+        Work out how each of the player's moves resolves against the current enemy.
+        Called whenever the enemy or the player's moves change, so the menu only reads the results.
+        """
+        self.move_previews = [move_preview(move, self.current_enemy["attacks"], self.player_stats["armor_rating"])
+                              for move in self.player_stats["moves"]]
+        self.kill_chances = {}  # Enemy health -> kill chance per move
+
+    def move_kill_chances(self):
+        """
+        Get the chance that each move kills the current enemy this turn, computed once per enemy health.
+
+        :return: A tuple of probabilities, indexed like player_stats["moves"].
+        """
+        health = self.current_enemy["health"]
+        chances = self.kill_chances.get(health)
+        if chances is None:
+            chances = self.kill_chances[health] = tuple(kill_chance(preview, health) for preview in self.move_previews)
+        return chances
+
+    def record_turn(self, turn, count=1):
+        """
+        Count a resolved turn in the floor and run stats and the combat stats, or take it back.
+
+        :param turn: The turn's tuple, as kept in pending_turns.
+        :param count: 1 to count the turn, -1 to take it back when it is undone.
+        """
+        floor_number, enemy_id, player_type, enemy_type, outcome, attack_index, dealt, enemy_taken, taken = turn
+        floor_stats = self.current_floor_stats(floor_number)
+        floor_stats["turns"] += count
+        floor_stats["damage_dealt"] += count * dealt
+        floor_stats["damage_taken"] += count * taken
+        self.run_stats["turns"] += count
+        if self.combat_stats:
+            self.combat_stats.record_turn(player_type, enemy_type, outcome, enemy_id, attack_index, enemy_taken, count)
+
+    def commit_turns(self):
+        """
+        Make the pending turns final, so they can no longer be undone.
+        """
+        self.pending_turns.clear()
+        self.undo_stack.clear()
+
+    def close_rewards_popup(self):
+        """
+        Close the rewards pop-up and move on to the next enemy.
+        """
+        self.show_rewards_popup = False
+        self.next_enemy()
+
+    def toggle_auto_battle(self):
+        """
+        Switch auto-battle on or off.
+        """
+        if self.autopilot is None:
+            self.autopilot = Autopilot(max_nodes=AUTOPILOT_NODES)
+            self.combat_log.append("Auto-battle enabled.")
+        else:
+            self.autopilot = None
+            self.combat_log.append("Auto-battle disabled.")
+
+    def auto_battle_step(self):
+        """
+        Let the autopilot take the action the player would take in the current state.
+        """
+        if self.show_rewards_popup:
+            self.close_rewards_popup()
+        elif self.turn_state == "player_turn":
+            self.selected_index = self.autopilot.choose_move(
+                self.player_stats["moves"], self.player_stats["health"], self.player_stats["armor_rating"],
+                self.current_enemy, self.enemy_move)
+            self.confirm_move(self.selected_index)
+        elif self.turn_state == "resolve_turn":
+            self.resolve_combat()
+            self.selected_index = 0
+        elif self.turn_state == "game_over":
+            self.autopilot = None
+
+    def on_enter(self):
+        """
+        Start generating the next floor and loading the floor's portraits in the background
+        once the game is on screen.
+        """
+        self.prefetch_next_floor()
+        for monsters in self.current_floor.values():
+            self.manager.assets.prefetch("monsters", monsters)
+
+    def on_exit(self):
+        """
+        Drop any background work for this game when it leaves the screen.
+        """
+        if self.next_floor_task is not None:
+            self.manager.scheduler.cancel(self.next_floor_task)
+            self.next_floor_task = None
+        if self.recorder:
+            self.recorder.end(self.frame, self.state_digest())
+        if not self.run_stats["saved"]:
+            self.save_run("quit")
+
+    def on_data_reload(self, change):
+        """
+        Patch the running game with an edited data file, keeping the current run going.
+
+        :param change: A change dictionary from DataWatcher.poll().
+        """
+        if change["name"] == "monsters":
+            self.floor_generator.apply_monster_changes(change)
+            for monsters in self.current_floor.values():
+                self.floor_generator.patch_spawned(monsters, change)
+            if self.next_floor_task is not None:
+                # Finish the prefetched floor now so its monsters are patched too
+                for monsters in self.manager.scheduler.finish(self.next_floor_task).values():
+                    self.floor_generator.patch_spawned(monsters, change)
+            if self.horde is not None:
+                self.horde.load(self.current_enemies)
+        elif change["name"] in PROFILE_SLOTS:
+            item = self.character.get(PROFILE_SLOTS[change["name"]])
+            if not item or item.get("id") not in change["changed"]:
+                return
+            old, new = change["changed"][item["id"]]
+            patch_record(item, old, new)
+
+            # Rebuild the derived stats around the edited item, keeping the player's health
+            health = self.player_stats["health"]
+            self.player_stats = self._get_player_stats()
+            self.player_stats["health"] = health
+            self.selected_index = min(self.selected_index, len(self.player_stats["moves"]) - 1)
+        else:
+            return
+
+        # Snapshots taken before the edit would bring back the old stats
+        self.commit_turns()
+        self.refresh_move_previews()
+        if self.autopilot:
+            self.autopilot.reset()
+
+    def floor_rng(self, floor_number):
+        """
+        Get the random stream a floor of the current run is drawn from.
+
+        Each floor has a stream of its own, so a floor comes out the same whether it
+        was prefetched, generated on the spot or prefetched and then thrown away.
+
+        :param floor_number: The floor's number.
+        :return: A random.Random instance.
+        """
+        return random.Random(f"{self.seed}:{self.run_number}:{floor_number}")
+
+    def prefetch_next_floor(self):
+        """
+        Schedule generation of the next floor across the spare time of upcoming frames.
+        """
+        if self.next_floor_task is None and self.manager is not None:
+            floor_number = self.current_floor_number + 1
+            self.next_floor_key = (self.run_number, floor_number)
+            self.next_floor_task = self.manager.scheduler.spawn(
+                self.floor_generator.generate_floor_steps(floor_number, self.floor_rng(floor_number)), name="generate_floor")
+
+    def take_next_floor(self, floor_number):
+        """
+        Get the prefetched next floor, finishing its generation now if it is not ready yet.
+
+        :param floor_number: The number of the floor to get.
+        :return: The floor dictionary.
+        """
+        task, self.next_floor_task = self.next_floor_task, None
+        floor = None
+        if task is not None:
+            if self.next_floor_key == (self.run_number, floor_number):
+                floor = self.manager.scheduler.finish(task)
+            else:
+                self.manager.scheduler.cancel(task)
+        if floor is None:
+            floor = self.floor_generator.generate_floor(floor_number, self.floor_rng(floor_number))
+        self.prefetch_next_floor()
+        if self.manager is not None:
+            for monsters in floor.values():
+                self.manager.assets.prefetch("monsters", monsters)
+        return floor
+
+    def update(self):
+        """
+        Advance the game by one frame.
+        """
+        self.frame += 1
+
+        # Enemy turn logic
+        if self.turn_state == "enemy_turn":
+            attacks = self.current_enemy["attacks"]
+            self.enemy_move_index = self.rng.randrange(len(attacks))
+            self.enemy_move = attacks[self.enemy_move_index]
+            self.combat_log.append(f"Enemy uses {self.enemy_move['name']} ({self.enemy_move['type']})!")
+            if self.horde is not None:
+                self.horde.choose_moves(self.horde_rng)
+            self.turn_state = "player_turn"
+        elif self.autopilot is not None:
+            self.auto_battle_step()
+
+    def draw(self):
+        """
+        Draw the game UI.
+        """
+        self.screen.fill(BLACK)
+
+        self.draw_enemy_stats()
+        self.draw_player_stats()
+        if self.turn_state == "player_turn":
+            self.draw_menu("Choose Your Move", self.player_stats["moves"], self.selected_index)
+            self.draw_previewed_move()
+        self.draw_combat_log()
+        self.draw_prompt()
+        self.draw_floor_info()
+
+        # Draw rewards pop-up if applicable
+        if self.show_rewards_popup:
+            self.draw_rewards_popup()
+
+        # Draw game over pop-up if applicable
+        if self.turn_state == "game_over":
+            self.draw_game_over_popup()
+
     def run(self):
         """
-        Run the main game loop.
-        """
-        running = True
-        selected_index = 0
-
-        while running:
-            self.screen.fill(BLACK)
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if self.show_rewards_popup:
-                        if event.key == pygame.K_RETURN:
-                            self.show_rewards_popup = False
-                            self.next_enemy()
-                    elif self.turn_state == "player_turn":
-                        if event.key == pygame.K_UP:
-                            selected_index = (selected_index - 1) % len(self.player_stats["moves"])
-                        elif event.key == pygame.K_DOWN:
-                            selected_index = (selected_index + 1) % len(self.player_stats["moves"])
-                        elif event.key == pygame.K_RETURN:
-                            self.player_move = self.player_stats["moves"][selected_index]
-                            self.combat_log.append(f"You use {self.player_move['name']} ({self.player_move['type']})!")
-                            self.turn_state = "resolve_turn"
-                    elif self.turn_state == "resolve_turn" and event.key == pygame.K_RETURN:
-                        self.resolve_combat()
-                        selected_index = 0  # Reset selection for the next turn
-                    elif self.turn_state == "game_over":
-                        if event.key == pygame.K_UP:  # Restart the game
-                            self.reset_game()
-                        elif event.key == pygame.K_DOWN:  # Quit the game
-                            running = False
-
-            # Enemy turn logic
-            if self.turn_state == "enemy_turn":
-                self.enemy_move = random.choice(self.current_enemy["attacks"])
-                self.combat_log.append(f"Enemy uses {self.enemy_move['name']} ({self.enemy_move['type']})!")
-                self.turn_state = "player_turn"
-
-            # Draw UI
-            self.draw_enemy_stats()
-            self.draw_player_stats()
-            if self.turn_state == "player_turn":
-                self.draw_menu("Choose Your Move", self.player_stats["moves"], selected_index)
-            self.draw_combat_log()
-            self.draw_prompt()
-            self.draw_floor_info()
-
-            # Draw rewards pop-up if applicable
-            if self.show_rewards_popup:
-                self.draw_rewards_popup()
-
-            # Draw game over pop-up if applicable
-            if self.turn_state == "game_over":
-                self.draw_game_over_popup()
-
-            pygame.display.flip()
-            self.clock.tick(30)
-
-        pygame.quit()
+        Run the game as the only screen of a new SceneManager.
+        """
+        manager = SceneManager(telemetry=self.telemetry)
+        manager.push(self)
+        manager.run()
 
     def resolve_combat(self):
         """
@@ -311,34 +679,26 @@ class MainGameLoop:
         # Determine RPS outcome
         player_type = self.player_move["type"]
         enemy_type = self.enemy_move["type"]
-
-        if player_type == enemy_type:
-            outcome = "neutral"
-        elif (player_type == "Rock" and enemy_type == "Scissors") or \
-             (player_type == "Paper" and enemy_type == "Rock") or \
-             (player_type == "Scissors" and enemy_type == "Paper"):
-            outcome = "superior"
-        else:
-            outcome = "weak"
+        outcome = rps_outcome(player_type, enemy_type)
 
         # Apply RPS mechanics
-        if outcome == "superior":
+        if outcome == SUPERIOR:
             # Player counters enemy move, enemy flinches
-            damage_multiplier = 1.75
+            damage_multiplier = SUPERIOR_MULTIPLIER
             self.combat_log.append(f"Your {player_type} counters {enemy_type}! Enemy flinches!")
             enemy_damage = 0  # Enemy skips their attack
-        elif outcome == "neutral":
+        elif outcome == NEUTRAL:
             # Neutral outcome
-            damage_multiplier = 1.0
-            if random.random() < 0.05:  # 5% chance to flinch
+            damage_multiplier = NEUTRAL_MULTIPLIER
+            if self.rng.random() < NEUTRAL_FLINCH_CHANCE:  # 5% chance to flinch
                 self.combat_log.append(f"Enemy flinches!")
                 enemy_damage = 0
             else:
                 enemy_damage = self.enemy_move["damage"]
-        elif outcome == "weak":
+        elif outcome == WEAK:
             # Weak outcome
-            damage_multiplier = 0.75
-            enemy_damage = self.enemy_move["damage"] * 1.25
+            damage_multiplier = WEAK_MULTIPLIER
+            enemy_damage = self.enemy_move["damage"] * WEAK_ENEMY_MULTIPLIER
             self.combat_log.append(f"Your {player_type} is weak against {enemy_type}!")
 
         # Player attacks enemy
@@ -348,13 +708,44 @@ class MainGameLoop:
 
         # Enemy attacks player
         if enemy_damage > 0:
-            player_damage_taken = (enemy_damage) * (1 - self.player_stats["armor_rating"] / 100)
+            player_damage_taken = damage_taken(enemy_damage, self.player_stats["armor_rating"])
             self.player_stats["health"] -= player_damage_taken
             self.combat_log.append(f"{self.current_enemy['name']} deals {player_damage_taken} {enemy_type} damage to you!")
+        else:
+            player_damage_taken = 0
+
+        enemy_damage_taken = player_damage_taken
+
+        # The rest of the horde attacks all at once
+        if self.horde is not None:
+            self.horde.health[self.current_enemy_index] = self.current_enemy["health"]
+            horde_damage, hits = self.horde.resolve_attacks(TYPE_CODES[player_type], self.current_enemy_index + 1, self.horde_rng)
+            if hits:
+                horde_damage_taken = damage_taken(horde_damage * HORDE_DAMAGE_SHARE, self.player_stats["armor_rating"])
+                self.player_stats["health"] -= horde_damage_taken
+                player_damage_taken += horde_damage_taken
+                self.combat_log.append(f"The horde lands {hits} hits for {horde_damage_taken:.1f} damage!")
+
+        # Count the turn right away; undo takes back the turns still pending
+        turn = (self.current_floor_number, self.current_enemy["id"], player_type, enemy_type, outcome,
+                self.enemy_move_index, player_damage, enemy_damage_taken, player_damage_taken)
+        self.record_turn(turn)
+        self.pending_turns.append(turn)
+        if self.telemetry:
+            self.telemetry.record(COMBAT, self.current_floor_number, self.current_enemy["id"], player_type, enemy_type,
+                                  outcome, player_damage, player_damage_taken)
+        if self.horde is not None:
+            self.commit_turns()
 
         # Check if the enemy is defeated
         if self.current_enemy["health"] <= 0:
             self.combat_log.append(f"{self.current_enemy['name']} is defeated!")
+            self.commit_turns()
+            floor_stats = self.current_floor_stats()
+            floor_stats["kills"] += 1
+            self.run_stats["kills"] += 1
+            if self.combat_stats:
+                self.combat_stats.record_kill(self.current_enemy["id"])
             self.generate_rewards()
             self.show_rewards_popup = True
 
@@ -362,9 +753,11 @@ class MainGameLoop:
         if self.player_stats["health"] <= 0:
             self.combat_log.append("You have been defeated!")
             self.turn_state = "game_over"
+            self.save_run("defeated", self.current_enemy)
 
         # Reset moves for the next turn
         self.enemy_move = None
+        self.enemy_move_index = None
         self.player_move = None
         if self.turn_state != "game_over":
             self.turn_state = "enemy_turn"
@@ -375,9 +768,12 @@ class MainGameLoop:
         """
         self.rewards = []
         for loot in self.current_enemy["loot_table"]:
-            if random.random() < loot["chance"]:
-                quantity = loot["quantity"] if isinstance(loot["quantity"], int) else random.randint(loot["quantity"][0], loot["quantity"][1])
+            if self.rng.random() < loot["chance"]:
+                quantity = loot["quantity"] if isinstance(loot["quantity"], int) else self.rng.randint(loot["quantity"][0], loot["quantity"][1])
                 self.rewards.append({"item": loot["item"], "quantity": quantity})
+                self.run_stats["loot"][loot["item"]] = self.run_stats["loot"].get(loot["item"], 0) + quantity
+                if self.telemetry:
+                    self.telemetry.record(LOOT, self.current_enemy["id"], loot["item"], quantity)
 
     def next_enemy(self):
         """
@@ -386,6 +782,7 @@ class MainGameLoop:
         self.current_enemy_index += 1
         if self.current_enemy_index < len(self.current_enemies):
             self.current_enemy = self.current_enemies[self.current_enemy_index]
+            self.refresh_move_previews()
             self.reset_combat_state()
         else:
             self.next_room()
@@ -394,29 +791,134 @@ class MainGameLoop:
         """
         Move to the next room on the floor.
         """
-        if self.current_room == "Room A":
-            self.current_room = "Room B"
-        elif self.current_room == "Room B":
-            self.current_room = "Room C"
-        elif self.current_room == "Room C":
+        rooms = list(self.current_floor)
+        position = rooms.index(self.current_room) + 1
+        if position < len(rooms):
+            room = rooms[position]
+        else:
             self.combat_log.append("You have cleared the floor!")
             self.current_floor_number += 1
-            self.current_floor = self.floor_generator.generate_floor()
-            self.current_room = "Room A"
+            self.current_floor = self.take_next_floor(self.current_floor_number)
+            room = "Room A"
+
+        if self.telemetry:
+            self.telemetry.record(FLOOR, self.current_floor_number, room)
 
-        self.current_enemies = self.current_floor[self.current_room]
+        self.enter_room(room)
+        self.reset_combat_state()
+
+    def enter_room(self, room):
+        """
+        Make a room of the current floor the one being fought, starting with its first enemy.
+
+        In a horde room, every monster is also loaded into the horde table, so the ones
+        waiting behind the current enemy can attack together each turn.
+
+        :param room: The room's name.
+        """
+        self.current_room = room
+        self.current_enemies = self.current_floor[room]
         self.current_enemy_index = 0
         self.current_enemy = self.current_enemies[self.current_enemy_index]
-        self.reset_combat_state()
+        self.refresh_move_previews()
+        self.horde = None
+        if room == HORDE_ROOM:
+            self.enter_horde()
+
+    def enter_horde(self):
+        """
+        Load the current room's monsters into the horde table.
+
+        NumPy is only imported here, so the game runs without it until a horde room is
+        reached; without it, the horde is fought one monster at a time like any other room.
+        """
+        try:
+            import numpy as np
+            from entity_table import EntityTable
+        except ImportError:
+            print("NumPy is not installed, so the horde attacks one monster at a time.")
+            return
+
+        if self.horde_table is None:
+            self.horde_table = EntityTable()
+        self.horde = self.horde_table
+        self.horde.load(self.current_enemies)
+        # A stream of its own, so the horde's rolls never shift the game's other rolls
+        self.horde_rng = np.random.default_rng([self.seed, self.run_number, self.current_floor_number])
+
+    def state_digest(self):
+        """
+        Hash the parts of the game state that replays are checked against.
+
+        :return: A hex digest of the current game state.
+        """
+        state = (
+            self.player_stats["health"],
+            self.current_floor_number,
+            self.current_room,
+            self.current_enemy_index,
+            [(enemy["id"], enemy["health"]) for enemy in self.current_enemies],
+            self.turn_state,
+            self.combat_log,
+        )
+        return hashlib.sha256(repr(state).encode("utf-8")).hexdigest()
 
     def reset_combat_state(self):
         """
         Reset the combat state when entering a new room or floor.
         """
         self.enemy_move = None
+        self.enemy_move_index = None
         self.player_move = None
+        self.previewed_move = None
         self.turn_state = "enemy_turn"
         self.combat_log.clear()
+        self.commit_turns()
+
+    def start_run_stats(self):
+        """
+        Start collecting the stats of a new run for the run history.
+        """
+        self.run_stats = {"kills": 0, "turns": 0, "floors": {}, "loot": {}, "saved": False}
+        if self.combat_stats:
+            self.combat_stats.start_run()
+
+    def current_floor_stats(self, floor_number=None):
+        """
+        Get the stats being collected for a floor of the current run.
+
+        :param floor_number: The floor's number (defaults to the current floor).
+        :return: A dictionary of kills, turns, damage_dealt and damage_taken.
+        """
+        floor_number = floor_number or self.current_floor_number
+        floors = self.run_stats["floors"]
+        stats = floors.get(floor_number)
+        if stats is None:
+            stats = floors[floor_number] = {"kills": 0, "turns": 0, "damage_dealt": 0.0, "damage_taken": 0.0}
+        return stats
+
+    def save_run(self, outcome, death_monster=None):
+        """
+        Store the summary of the current run in the run history.
+
+        :param outcome: How the run ended ("defeated" or "quit").
+        :param death_monster: The monster that defeated the player, if any.
+        """
+        self.run_stats["saved"] = True
+        if self.combat_stats:
+            self.combat_stats.save()
+        if self.run_history is None or not self.run_stats["turns"]:
+            return
+        self.run_history.record_run({
+            "outcome": outcome,
+            "floor_reached": self.current_floor_number,
+            "kills": self.run_stats["kills"],
+            "turns": self.run_stats["turns"],
+            "character": self.character,
+            "death_monster": death_monster,
+            "floors": self.run_stats["floors"],
+            "loot": self.run_stats["loot"],
+        })
 
     def reset_game(self):
         """
@@ -424,14 +926,13 @@ class MainGameLoop:
         """
         # Reset player stats
         self.player_stats = self._get_player_stats()
+        self.start_run_stats()
 
         # Reset floor and room
-        self.current_floor = self.floor_generator.generate_floor()
+        self.run_number += 1
         self.current_floor_number = 1
-        self.current_room = "Room A"
-        self.current_enemies = self.current_floor[self.current_room]
-        self.current_enemy_index = 0
-        self.current_enemy = self.current_enemies[self.current_enemy_index]
+        self.current_floor = self.take_next_floor(self.current_floor_number)
+        self.enter_room("Room A")
 
         # Reset combat state
         self.reset_combat_state()
@@ -442,5 +943,6 @@ class MainGameLoop:
 
 # Run the game
 if __name__ == "__main__":
-    game = MainGameLoop("character_profile.json", "data/monsters.json")
+    game = MainGameLoop("character_profile.json", "data/monsters.json", telemetry=Telemetry.from_env(),
+                        recorder=ReplayRecorder.from_env())
     game.run()
\ No newline at end of file
@@ -0,0 +1,84 @@
+from cache import LRUCache
+
+# Per-floor stat growth as (rate, exponent): a stat is multiplied by
+# 1 + rate * (floor - 1) ** exponent, so monsters keep getting tougher
+# while the growth per floor slowly levels off
+SCALING_CURVES = {
+    "health": (0.12, 0.75),
+    "attack": (0.06, 0.75),
+    "damage": (0.06, 0.75),
+}
+
+class MonsterScaler:
+    def __init__(self, curves=None, cache_size=4096):
+        """
+        Initialize the scaling of monster stats by floor.
+
+        The scaled stats of a (template, floor) pair are computed the first time the
+        pair spawns and kept in a bounded cache, so spawning costs a lookup and a
+        shallow copy.
+
+        :param curves: A dictionary of stat name ("health", "attack" or "damage") to (rate, exponent).
+        :param cache_size: Maximum number of scaled templates kept.
+        """
+        self.curves = SCALING_CURVES if curves is None else curves
+        self.cache = LRUCache(cache_size)
+
+    def multiplier(self, stat, floor_number):
+        """
+        Get the multiplier of a stat on a floor.
+
+        :param stat: The stat name.
+        :param floor_number: The floor's number, starting at 1.
+        :return: The multiplier.
+        """
+        rate, exponent = self.curves.get(stat, (0.0, 1.0))
+        return 1.0 + rate * max(0, floor_number - 1) ** exponent
+
+    def scale(self, template, floor_number):
+        """
+        Compute a template's stats on a floor, without the cache.
+
+        :param template: The monster dictionary from the database.
+        :param floor_number: The floor's number.
+        :return: A new monster dictionary with scaled health, attack and attack damage.
+        """
+        damage = self.multiplier("damage", floor_number)
+        scaled = dict(template)
+        scaled["health"] = round(template["health"] * self.multiplier("health", floor_number))
+        scaled["attack"] = round(template["attack"] * self.multiplier("attack", floor_number))
+        scaled["attacks"] = [dict(attack, damage=round(attack["damage"] * damage)) for attack in template["attacks"]]
+        scaled["floor"] = floor_number
+        return scaled
+
+    def scaled(self, template, floor_number):
+        """
+        Get a template's stats on a floor, computing them once per (template, floor).
+
+        The returned dictionary is shared and must not be changed; use spawn() for a monster
+        that takes part in combat.
+
+        :param template: The monster dictionary from the database.
+        :param floor_number: The floor's number.
+        :return: The scaled monster dictionary.
+        """
+        key = (template["id"], floor_number)
+        scaled = self.cache.get(key)
+        if scaled is None:
+            scaled = self.scale(template, floor_number)
+            self.cache.put(key, scaled)
+        return scaled
+
+    def spawn(self, template, floor_number):
+        """
+        Create a monster instance for a floor, with health of its own.
+
+        :param template: The monster dictionary from the database.
+        :param floor_number: The floor's number.
+        :return: A shallow copy of the scaled monster dictionary.
+        """
+        return dict(self.scaled(template, floor_number))
+
+    def clear(self):
+        """Drop every cached scaled template, for when the monster data changed."""
+        self.cache.clear()
@@ -0,0 +1,202 @@
+import argparse
+import os
+import time
+import numpy as np
+from combat_rules import TYPE_CODES
+
+# Turn outcomes, from the player's side
+DRAW = 0
+SUPERIOR = 1
+WEAK = 2
+
+# Match results
+ONGOING = 0
+WON = 1
+LOST = -1
+
+def encode_moves(moves):
+    """
+    Turn a list of move dictionaries into arrays.
+
+    :param moves: Move dictionaries with a type and damage.
+    :return: A (types, damage) tuple of arrays, indexed by move.
+    """
+    types = np.array([TYPE_CODES[move["type"]] for move in moves], dtype=np.int8)
+    damage = np.array([move["damage"] for move in moves], dtype=np.int32)
+    return types, damage
+
+def resolve_turns(player_types, player_damage, enemy_types, enemy_damage, player_hp, enemy_hp,
+                  player_armor, enemy_armor, active):
+    """
+    Resolve one turn of many independent PvP matches at once.
+
+    The rules follow pvp_loop.MainGameLoop.resolve_combat: the winner of the
+    Rock-Paper-Scissors exchange deals its move's damage minus the loser's armor,
+    a draw deals no damage, and the player loses when their health drops to zero
+    before the enemy's does. player_hp and enemy_hp are updated in place.
+
+    :param player_types: The type code of each match's player move.
+    :param player_damage: The damage of each match's player move.
+    :param enemy_types: The type code of each match's enemy move.
+    :param enemy_damage: The damage of each match's enemy move.
+    :param player_hp: The player's health per match.
+    :param enemy_hp: The enemy's health per match.
+    :param player_armor: The player's armor rating, per match or as a single value.
+    :param enemy_armor: The enemy's armor rating, per match or as a single value.
+    :param active: Boolean mask of the matches still being played.
+    :return: A (outcome, won, lost) tuple: the outcome code per match and masks of the
+             matches won and lost on this turn.
+    """
+    outcome = (player_types - enemy_types) % 3
+    superior = active & (outcome == SUPERIOR)
+    weak = active & (outcome == WEAK)
+
+    enemy_hp -= np.maximum(player_damage - enemy_armor, 0) * superior
+    player_hp -= np.maximum(enemy_damage - player_armor, 0) * weak
+
+    lost = weak & (player_hp <= 0)
+    won = superior & (enemy_hp <= 0)
+    return outcome, won, lost
+
+class PvPBatch:
+    def __init__(self, player_moves, enemy_moves, matches, player_health=100, enemy_health=100,
+                 player_armor=0, enemy_armor=0):
+        """
+        Initialize a batch of independent PvP matches between the same two fighters.
+
+        :param player_moves: The player's move dictionaries.
+        :param enemy_moves: The enemy's move dictionaries.
+        :param matches: Number of matches.
+        :param player_health: The player's starting health.
+        :param enemy_health: The enemy's starting health.
+        :param player_armor: The player's armor rating.
+        :param enemy_armor: The enemy's armor rating.
+        """
+        self.player_types, self.player_damage = encode_moves(player_moves)
+        self.enemy_types, self.enemy_damage = encode_moves(enemy_moves)
+        self.matches = matches
+        self.player_armor = player_armor
+        self.enemy_armor = enemy_armor
+        self.player_hp = np.full(matches, player_health, dtype=np.int32)
+        self.enemy_hp = np.full(matches, enemy_health, dtype=np.int32)
+        self.active = np.ones(matches, dtype=bool)
+        self.result = np.full(matches, ONGOING, dtype=np.int8)
+        self.turns = np.zeros(matches, dtype=np.int32)
+
+    def step(self, player_choice, enemy_choice):
+        """
+        Play one turn of every match that is still going.
+
+        :param player_choice: The index of the player's move in each match.
+        :param enemy_choice: The index of the enemy's move in each match.
+        :return: The outcome code of the turn in each match.
+        """
+        outcome, won, lost = resolve_turns(
+            self.player_types[player_choice], self.player_damage[player_choice],
+            self.enemy_types[enemy_choice], self.enemy_damage[enemy_choice],
+            self.player_hp, self.enemy_hp, self.player_armor, self.enemy_armor, self.active)
+        self.turns += self.active
+        self.result[won] = WON
+        self.result[lost] = LOST
+        self.active &= ~(won | lost)
+        return outcome
+
+    def best_replies(self):
+        """
+        Get the player's best answer to each enemy move, as the move with the highest net damage.
+
+        :return: An array of player move indices, indexed by enemy move.
+        """
+        outcome = (self.player_types[None, :] - self.enemy_types[:, None]) % 3
+        dealt = np.maximum(self.player_damage[None, :] - self.enemy_armor, 0) * (outcome == SUPERIOR)
+        taken = np.maximum(self.enemy_damage[:, None] - self.player_armor, 0) * (outcome == WEAK)
+        return np.argmax(dealt - taken, axis=1)
+
+# Move-selection strategies: each takes the batch, the enemy's chosen moves and the
+# random generator, and returns the player's move index per match
+def random_strategy(batch, enemy_choice, rng):
+    """Pick one of the player's moves at random."""
+    return rng.integers(0, len(batch.player_types), batch.matches)
+
+def counter_strategy(batch, enemy_choice, rng):
+    """Answer the announced enemy move with the best reply to it."""
+    return batch.best_replies()[enemy_choice]
+
+def first_move_strategy(batch, enemy_choice, rng):
+    """Always use the first move."""
+    return np.zeros(batch.matches, dtype=np.intp)
+
+STRATEGIES = {
+    "random": random_strategy,
+    "counter": counter_strategy,
+    "first": first_move_strategy,
+}
+
+def simulate(strategy, player_moves, enemy_moves, matches=100000, player_health=100, enemy_health=100,
+             player_armor=0, enemy_armor=0, max_turns=500, seed=0):
+    """
+    Play matches until every one is decided and summarize the strategy's results.
+
+    The enemy picks its move at random every turn, as in pvp_loop.MainGameLoop.enemy_turn.
+
+    :param strategy: A move-selection strategy (see STRATEGIES).
+    :param max_turns: Turns after which undecided matches are left as they are.
+    :param seed: Seed of the random generator.
+    :return: A dictionary with the win, loss and undecided rates and the distribution of match lengths.
+    """
+    rng = np.random.default_rng(seed)
+    batch = PvPBatch(player_moves, enemy_moves, matches, player_health, enemy_health, player_armor, enemy_armor)
+    for _ in range(max_turns):
+        if not batch.active.any():
+            break
+        enemy_choice = rng.integers(0, len(batch.enemy_types), matches)
+        batch.step(strategy(batch, enemy_choice, rng), enemy_choice)
+
+    won = batch.result == WON
+    return {
+        "matches": matches,
+        "win_rate": float(won.mean()),
+        "loss_rate": float((batch.result == LOST).mean()),
+        "undecided_rate": float(batch.active.mean()),
+        "turns_p50": float(np.percentile(batch.turns, 50)),
+        "turns_p99": float(np.percentile(batch.turns, 99)),
+        "health_left_on_win": float(batch.player_hp[won].mean()) if won.any() else 0.0,
+    }
+
+def match_setup(profile_path):
+    """
+    Read the player and rival of a PvP match the same way the PvP game does.
+
+    :param profile_path: Path to the player profile JSON file.
+    :return: A dictionary of simulate() keyword arguments for the match.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from pvp_loop import MainGameLoop as PvPGameLoop
+
+    game = PvPGameLoop(profile_path)
+    return {
+        "player_moves": game.player_stats["moves"],
+        "enemy_moves": game.enemy["moves"],
+        "player_health": game.player_stats["health"],
+        "enemy_health": game.enemy["health"],
+        "player_armor": game.player_stats["armor_rating"],
+        "enemy_armor": game.enemy["armor_rating"],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure PvP move-selection strategies over many simulated matches.")
+    parser.add_argument("--profile", default="pvp_profile.json", help="Player profile to play.")
+    parser.add_argument("--matches", type=int, default=1000000, help="Number of matches per strategy.")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), action="append", help="Strategy to measure (default: all).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the simulated matches.")
+    args = parser.parse_args()
+
+    setup = match_setup(args.profile)
+    for name in args.strategy or sorted(STRATEGIES):
+        start = time.perf_counter()
+        summary = simulate(STRATEGIES[name], matches=args.matches, seed=args.seed, **setup)
+        print(f"{name}: {summary['win_rate']:.2%} won, {summary['loss_rate']:.2%} lost, "
+              f"{summary['undecided_rate']:.2%} undecided - turns p50 {summary['turns_p50']:.0f}, "
+              f"p99 {summary['turns_p99']:.0f}, health left on a win {summary['health_left_on_win']:.1f} "
+              f"({summary['matches']} matches in {time.perf_counter() - start:.2f}s)")
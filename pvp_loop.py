@@ -1,15 +1,15 @@
 import pygame
 import json
 import random
+from scene_manager import Scene, SceneManager, SCREEN_WIDTH, SCREEN_HEIGHT
+from telemetry import PVP_COMBAT, Telemetry
 
 # Initialize Pygame
 pygame.init()
 
 # Constants
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-FONT = pygame.font.Font(None, 36)
-SMALL_FONT = pygame.font.Font(None, 24)
+FONT = 36
+SMALL_FONT = 24
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 HIGHLIGHT = (200, 200, 0)
@@ -22,17 +22,16 @@ GRAY = (128, 128, 128)
 # UI Constants
 UI_PADDING = 20
 
-class MainGameLoop:
-    def __init__(self, player_profile_path):
+class MainGameLoop(Scene):
+    caption = "PvP Battle RPG"
+
+    def __init__(self, player_profile_path, telemetry=None):
         """
         Initialize the Main Game Loop.
 
         :param player_profile_path: Path to the player profile JSON file.
+        :param telemetry: Optional Telemetry sink that records gameplay events.
         """
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("PvP Battle RPG")
-        self.clock = pygame.time.Clock()
-
         # Load player profile
         self.character = self._load_json(player_profile_path)
         self.player_stats = self._get_player_stats()
@@ -40,6 +39,8 @@ class MainGameLoop:
         self.combat_log = []
         self.turn_state = "enemy_turn"  # Start with enemy's turn
         self.enemy_move = None  # Variable to store enemy's chosen move
+        self.selected_index = 0
+        self.telemetry = telemetry
 
     def _load_json(self, path):
         """
@@ -126,13 +127,12 @@ class MainGameLoop:
         Draw text on the screen.
 
         :param text: The text to display.
-        :param x: X position of the text.
-        :param y: Y position of the text.
+        :param x: Logical X position of the text.
+        :param y: Logical Y position of the text.
         :param color: Color of the text.
-        :param font: Font to use for the text.
+        :param font: Size of the shared font to use for the text.
         """
-        text_surface = font.render(text, True, color)
-        self.screen.blit(text_surface, (x, y))
+        self.manager.draw_text(text, x, y, color, font)
 
     def draw_combat_log(self):
         """
@@ -186,46 +186,56 @@ class MainGameLoop:
         elif self.turn_state == "enemy_defeated":
             self.draw_text("You defeated the enemy! Press ENTER to continue...", UI_PADDING, 350, YELLOW, SMALL_FONT)
 
+    def handle_event(self, event):
+        """
+        Handle a Pygame event for the current turn state.
+
+        :param event: The Pygame event to handle.
+        """
+        if event.type != pygame.KEYDOWN:
+            return
+
+        if self.turn_state == "player_turn":
+            if event.key == pygame.K_UP:
+                self.selected_index = (self.selected_index - 1) % len(self.player_stats["moves"])
+            elif event.key == pygame.K_DOWN:
+                self.selected_index = (self.selected_index + 1) % len(self.player_stats["moves"])
+            elif event.key == pygame.K_RETURN:
+                self.player_move = self.player_stats["moves"][self.selected_index]
+                self.combat_log.append(f"You use {self.player_move['name']}!")
+                self.resolve_combat()
+                self.selected_index = 0  # Reset selection for the next turn
+
+        elif self.turn_state == "enemy_defeated" and event.key == pygame.K_RETURN:
+            self.manager.pop()  # Leave the battle after victory
+
+    def update(self):
+        """
+        Let the enemy choose its move in the same frame its turn starts.
+        """
+        if self.turn_state == "enemy_turn":
+            self.enemy_turn()
+
+    def draw(self):
+        """
+        Draw the battle UI.
+        """
+        self.screen.fill(BLACK)
+
+        self.draw_player_stats()
+        self.draw_enemy_stats()
+        if self.turn_state == "player_turn":
+            self.draw_menu("Choose Your Move", self.player_stats["moves"], self.selected_index)
+        self.draw_combat_log()
+        self.draw_prompt()
+
     def run(self):
         """
-        Run the main game loop.
-        """
-        running = True
-        selected_index = 0
-
-        while running:
-            self.screen.fill(BLACK)
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if self.turn_state == "enemy_turn":
-                        self.enemy_turn()  # Let the enemy choose its move
-                    elif self.turn_state == "player_turn":
-                        if event.key == pygame.K_UP:
-                            selected_index = (selected_index - 1) % len(self.player_stats["moves"])
-                        elif event.key == pygame.K_DOWN:
-                            selected_index = (selected_index + 1) % len(self.player_stats["moves"])
-                        elif event.key == pygame.K_RETURN:
-                            self.player_move = self.player_stats["moves"][selected_index]
-                            self.combat_log.append(f"You use {self.player_move['name']}!")
-                            self.resolve_combat()
-                            selected_index = 0  # Reset selection for the next turn
-
-                    elif self.turn_state == "enemy_defeated" and event.key == pygame.K_RETURN:
-                        running = False  # Exit the game after victory
-
-            # Draw UI
-            self.draw_player_stats()
-            self.draw_enemy_stats()
-            if self.turn_state == "player_turn":
-                self.draw_menu("Choose Your Move", self.player_stats["moves"], selected_index)
-            self.draw_combat_log()
-            self.draw_prompt()
-
-            pygame.display.flip()
-            self.clock.tick(30)
+        Run the battle as the only screen of a new SceneManager.
+        """
+        manager = SceneManager(telemetry=self.telemetry)
+        manager.push(self)
+        manager.run()
 
     def enemy_turn(self):
         """
@@ -242,12 +252,15 @@ class MainGameLoop:
         # Determine the outcome based on Rock-Paper-Scissors logic
         player_type = self.player_move["type"]
         enemy_type = self.enemy_move["type"]
+        enemy_damage = 0
+        player_damage = 0
 
         # Determine the winner of this round based on RPS logic
         if (player_type == "Rock" and enemy_type == "Scissors") or \
            (player_type == "Scissors" and enemy_type == "Paper") or \
            (player_type == "Paper" and enemy_type == "Rock"):
             # Player wins this round
+            outcome = "superior"
             enemy_damage = max(0, self.player_move["damage"] - self.enemy["armor_rating"])
             self.enemy["health"] -= enemy_damage
             self.combat_log.append(f"You attack {self.enemy['name']} with {self.player_move['name']} and deal {enemy_damage} damage!")
@@ -255,13 +268,18 @@ class MainGameLoop:
              (enemy_type == "Scissors" and player_type == "Paper") or \
              (enemy_type == "Paper" and player_type == "Rock"):
             # Enemy wins this round
+            outcome = "weak"
             player_damage = max(0, self.enemy_move["damage"] - self.player_stats["armor_rating"])
             self.player_stats["health"] -= player_damage
             self.combat_log.append(f"{self.enemy['name']} attacks you with {self.enemy_move['name']} and deals {player_damage} damage!")
         else:
             # It's a draw
+            outcome = "neutral"
             self.combat_log.append("It's a draw! No damage dealt.")
 
+        if self.telemetry:
+            self.telemetry.record(PVP_COMBAT, self.enemy["name"], player_type, enemy_type, outcome, enemy_damage, player_damage)
+
         # Check if the player is defeated
         if self.player_stats["health"] <= 0:
             self.combat_log.append("You have been defeated!")
@@ -273,6 +291,5 @@ class MainGameLoop:
             self.turn_state = "enemy_turn"  # Switch back to enemy turn after resolving combat
 
 if __name__ == "__main__":
-    game = MainGameLoop("pvp_profile.json")
+    game = MainGameLoop("pvp_profile.json", telemetry=Telemetry.from_env())
     game.run()
-    pygame.quit()
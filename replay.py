@@ -0,0 +1,195 @@
+import json
+import os
+import struct
+import tempfile
+import time
+
+# File layout: header, profile JSON, monster database path, then one record per
+# key press and a final end record carrying the frame count and state digest.
+MAGIC = b"LONR"
+VERSION = 2
+HEADER = struct.Struct("<4sBQII")  # magic, version, seed, profile length, monster db path length
+RECORD = struct.Struct("<IIi")  # frame, milliseconds since start, key
+END_FRAME = 0xFFFFFFFF
+DIGEST_SIZE = 32
+
+# Environment variable that opts a PvE session into recording
+RECORD_PATH_ENV = "LONER_RECORD"
+
+class ReplayRecorder:
+    def __init__(self, path):
+        """
+        Initialize a recorder that captures a game's seed and input to a compact binary file.
+
+        :param path: Path of the replay file to write.
+        """
+        self.path = path
+        self._file = None
+        self._start_time = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create a recorder if the player opted in through the environment.
+
+        :return: A ReplayRecorder instance, or None if recording is disabled.
+        """
+        path = os.environ.get(RECORD_PATH_ENV)
+        if not path:
+            return None
+        return cls(path)
+
+    def begin(self, seed, character, monster_db_path):
+        """
+        Start a new replay file.
+
+        :param seed: The game's random seed.
+        :param character: The character profile dictionary.
+        :param monster_db_path: Path to the monster database JSON file.
+        """
+        profile = json.dumps(character, separators=(",", ":")).encode("utf-8")
+        monster_db = os.fspath(monster_db_path).encode("utf-8")
+        self._file = open(self.path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, seed, len(profile), len(monster_db)))
+        self._file.write(profile)
+        self._file.write(monster_db)
+        self._start_time = time.perf_counter()
+
+    def record(self, frame, key):
+        """
+        Record a key press.
+
+        :param frame: The number of game updates that ran before the key press.
+        :param key: The Pygame key code.
+        """
+        elapsed_ms = int((time.perf_counter() - self._start_time) * 1000)
+        self._file.write(RECORD.pack(frame, elapsed_ms, key))
+
+    def end(self, frames, digest):
+        """
+        Finish the replay file with the final frame count and state digest.
+
+        :param frames: The number of game updates that ran.
+        :param digest: The hex digest returned by MainGameLoop.state_digest().
+        """
+        if self._file is None:
+            return
+        elapsed_ms = int((time.perf_counter() - self._start_time) * 1000)
+        self._file.write(RECORD.pack(END_FRAME, elapsed_ms, frames))
+        self._file.write(bytes.fromhex(digest))
+        self._file.close()
+        self._file = None
+
+def load_replay(path):
+    """
+    Load a replay file.
+
+    :param path: Path to the replay file.
+    :return: A dictionary with the seed, profile, monster database path, input events,
+             recorded frame count and final state digest.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    magic, version, seed, profile_length, monster_db_length = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} replay file.")
+
+    offset = HEADER.size
+    character = json.loads(data[offset:offset + profile_length])
+    offset += profile_length
+    monster_db_path = data[offset:offset + monster_db_length].decode("utf-8")
+    offset += monster_db_length
+
+    events = []
+    frames = None
+    digest = None
+    while offset + RECORD.size <= len(data):
+        frame, elapsed_ms, key = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if frame == END_FRAME:
+            frames = key
+            digest = data[offset:offset + DIGEST_SIZE].hex()
+            break
+        events.append((frame, elapsed_ms, key))
+
+    return {
+        "seed": seed,
+        "character": character,
+        "monster_db_path": monster_db_path,
+        "events": events,
+        "frames": frames,
+        "digest": digest,
+    }
+
+def play(path, monster_db_path=None):
+    """
+    Re-run a replay headlessly as fast as possible and check its final state.
+
+    :param path: Path to the replay file.
+    :param monster_db_path: Optional monster database to use instead of the recorded one.
+    :return: A dictionary with the playback timing, the final digest and whether it matches.
+    """
+    import pygame
+    from main_game_loop import MainGameLoop
+
+    replay = load_replay(path)
+
+    # The game loads its profile from disk, so hand it the recorded one
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as profile_file:
+        json.dump(replay["character"], profile_file)
+    try:
+        game = MainGameLoop(profile_file.name, monster_db_path or replay["monster_db_path"], seed=replay["seed"])
+    finally:
+        os.unlink(profile_file.name)
+
+    events = replay["events"]
+    frames = replay["frames"]
+    if frames is None:
+        # The recording was cut short; play every recorded input
+        frames = events[-1][0] if events else 0
+
+    start = time.perf_counter()
+    index = 0
+    for frame in range(frames + 1):
+        while index < len(events) and events[index][0] == frame:
+            game.handle_event(pygame.event.Event(pygame.KEYDOWN, key=events[index][2]))
+            index += 1
+        if frame < frames:
+            game.update()
+    elapsed = time.perf_counter() - start
+
+    digest = game.state_digest()
+    return {
+        "frames": frames,
+        "inputs": len(events),
+        "seconds": elapsed,
+        "frames_per_second": frames / elapsed if elapsed > 0 else float("inf"),
+        "digest": digest,
+        "expected_digest": replay["digest"],
+        "match": replay["digest"] is None or digest == replay["digest"],
+    }
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    # Play back without opening a window
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    if len(sys.argv) < 2:
+        print("Usage: python replay.py <replay file> [monster db path]")
+        sys.exit(1)
+
+    result = play(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Replayed {result['frames']} frames and {result['inputs']} inputs in {result['seconds']:.3f}s "
+          f"({result['frames_per_second']:.0f} frames/s)")
+    print(f"Final state: {result['digest']}")
+    if result["expected_digest"] is None:
+        print("No recorded final state to compare against.")
+    elif result["match"]:
+        print("Final state matches the recording.")
+    else:
+        print(f"Final state differs from the recording ({result['expected_digest']})!")
+        sys.exit(2)
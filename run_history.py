@@ -0,0 +1,207 @@
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    ended_at REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    floor_reached INTEGER NOT NULL,
+    kills INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    build TEXT NOT NULL,
+    ascendancy TEXT,
+    weapon TEXT,
+    armor TEXT,
+    spell TEXT,
+    death_monster_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS run_floors (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    floor INTEGER NOT NULL,
+    kills INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    damage_dealt REAL NOT NULL,
+    damage_taken REAL NOT NULL,
+    PRIMARY KEY (run_id, floor)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS run_loot (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    item TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (run_id, item)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS monster_deaths (
+    monster_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    deaths INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_floor ON runs (floor_reached DESC, kills DESC);
+CREATE INDEX IF NOT EXISTS runs_by_build ON runs (build, floor_reached DESC, kills DESC);
+CREATE INDEX IF NOT EXISTS runs_by_death ON runs (death_monster_id, floor_reached DESC);
+"""
+
+RUN_COLUMNS = "id, ended_at, outcome, floor_reached, kills, turns, build, ascendancy, weapon, armor, spell, death_monster_id"
+
+def build_key(character):
+    """
+    Describe a character profile's build as a single string.
+
+    :param character: The character profile dictionary.
+    :return: A string such as "Warrior / Steel Sword / Iron Plate / Fireball".
+    """
+    parts = [(character.get(slot) or {}).get("name", "None") for slot in ("ascendancy", "weapon", "armor", "spell")]
+    return " / ".join(parts)
+
+class RunHistory:
+    def __init__(self, path="run_history.db"):
+        """
+        Initialize the local run history store.
+
+        :param path: Path to the SQLite database file.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+    def record_run(self, summary):
+        """
+        Store a single finished run.
+
+        :param summary: A run summary dictionary (see record_runs).
+        """
+        self.record_runs([summary])
+
+    def record_runs(self, summaries):
+        """
+        Store finished runs with their per-floor stats and loot in one transaction.
+
+        Each summary holds outcome, floor_reached, kills, turns, character (the profile
+        dictionary), death_monster (the killing monster dictionary or None), floors
+        (a dictionary of floor number to kills, turns, damage_dealt and damage_taken)
+        and loot (a dictionary of item name to quantity).
+
+        :param summaries: The run summaries to store.
+        """
+        with self.connection:
+            cursor = self.connection.cursor()
+            floor_rows = []
+            loot_rows = []
+            death_counts = {}
+            ended_at = time.time()
+
+            for summary in summaries:
+                character = summary["character"]
+                death_monster = summary.get("death_monster")
+                cursor.execute(
+                    "INSERT INTO runs (ended_at, outcome, floor_reached, kills, turns, build, ascendancy, weapon, armor, spell, death_monster_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        summary.get("ended_at", ended_at),
+                        summary["outcome"],
+                        summary["floor_reached"],
+                        summary["kills"],
+                        summary["turns"],
+                        build_key(character),
+                        (character.get("ascendancy") or {}).get("name"),
+                        (character.get("weapon") or {}).get("name"),
+                        (character.get("armor") or {}).get("name"),
+                        (character.get("spell") or {}).get("name"),
+                        death_monster["id"] if death_monster else None,
+                    ),
+                )
+                run_id = cursor.lastrowid
+
+                for floor, stats in summary.get("floors", {}).items():
+                    floor_rows.append((run_id, floor, stats["kills"], stats["turns"], stats["damage_dealt"], stats["damage_taken"]))
+                for item, quantity in summary.get("loot", {}).items():
+                    loot_rows.append((run_id, item, quantity))
+                if death_monster:
+                    name, count = death_counts.get(death_monster["id"], (death_monster["name"], 0))
+                    death_counts[death_monster["id"]] = (name, count + 1)
+
+            cursor.executemany("INSERT INTO run_floors VALUES (?, ?, ?, ?, ?, ?)", floor_rows)
+            cursor.executemany("INSERT INTO run_loot VALUES (?, ?, ?)", loot_rows)
+            cursor.executemany(
+                "INSERT INTO monster_deaths (monster_id, name, deaths) VALUES (?, ?, ?) "
+                "ON CONFLICT (monster_id) DO UPDATE SET deaths = deaths + excluded.deaths, name = excluded.name",
+                [(monster_id, name, count) for monster_id, (name, count) in death_counts.items()],
+            )
+
+    def top_runs(self, limit=10):
+        """
+        Get the runs that reached the deepest floors.
+
+        :param limit: Number of runs to return.
+        :return: A list of sqlite3.Row objects.
+        """
+        return self.connection.execute(
+            f"SELECT {RUN_COLUMNS} FROM runs ORDER BY floor_reached DESC, kills DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+    def top_runs_for_build(self, build, limit=10):
+        """
+        Get the deepest runs made with a given build.
+
+        :param build: A build string from build_key().
+        :param limit: Number of runs to return.
+        :return: A list of sqlite3.Row objects.
+        """
+        return self.connection.execute(
+            f"SELECT {RUN_COLUMNS} FROM runs WHERE build = ? ORDER BY floor_reached DESC, kills DESC LIMIT ?", (build, limit)
+        ).fetchall()
+
+    def runs_killed_by(self, monster_id, limit=10):
+        """
+        Get the deepest runs that ended at the hands of a given monster.
+
+        :param monster_id: The monster's id.
+        :param limit: Number of runs to return.
+        :return: A list of sqlite3.Row objects.
+        """
+        return self.connection.execute(
+            f"SELECT {RUN_COLUMNS} FROM runs WHERE death_monster_id = ? ORDER BY floor_reached DESC LIMIT ?", (monster_id, limit)
+        ).fetchall()
+
+    def deadliest_monsters(self, limit=5):
+        """
+        Get the monsters that ended the most runs.
+
+        :param limit: Number of monsters to return.
+        :return: A list of sqlite3.Row objects with monster_id, name and deaths.
+        """
+        return self.connection.execute(
+            "SELECT monster_id, name, deaths FROM monster_deaths ORDER BY deaths DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+    def floor_stats(self, run_id):
+        """
+        Get the per-floor stats of a run.
+
+        :param run_id: The run's id.
+        :return: A list of sqlite3.Row objects.
+        """
+        return self.connection.execute(
+            "SELECT floor, kills, turns, damage_dealt, damage_taken FROM run_floors WHERE run_id = ? ORDER BY floor", (run_id,)
+        ).fetchall()
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    history = RunHistory(sys.argv[1] if len(sys.argv) > 1 else "run_history.db")
+
+    print("Top Runs:")
+    for run in history.top_runs():
+        print(f"  - Floor {run['floor_reached']}, {run['kills']} kills ({run['build']}, {run['outcome']})")
+
+    print("Deadliest Monsters:")
+    for monster in history.deadliest_monsters():
+        print(f"  - {monster['name']}: {monster['deaths']} runs ended")
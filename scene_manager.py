@@ -0,0 +1,276 @@
+import time
+import pygame
+from assets import AssetManager
+from latency import LatencyTracker
+from scheduler import FrameScheduler
+from telemetry import FRAME
+from viewport import Viewport
+
+# Constants
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+FPS = 30
+
+# Events that end the wait for the next frame early so their result is shown at once,
+# and that are timed as input latency samples
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN)
+
+class Scene:
+    """
+    Base class for a screen driven by the SceneManager.
+
+    Scenes never create a window, clock or fonts of their own and never run a
+    loop; the manager calls handle_event, update and draw once per frame on the
+    scene at the top of its stack.
+    """
+    caption = None
+    manager = None
+
+    @property
+    def screen(self):
+        """The shared display surface."""
+        return self.manager.screen
+
+    def on_enter(self):
+        """Called when the scene becomes the top of the stack."""
+
+    def on_exit(self):
+        """Called when the scene is removed from the stack."""
+
+    def handle_event(self, event):
+        """
+        Handle a single Pygame event.
+
+        :param event: The Pygame event to handle.
+        """
+
+    def update(self):
+        """Advance the scene by one frame."""
+
+    def draw(self):
+        """Draw the scene on the shared screen."""
+
+    def on_data_reload(self, change):
+        """
+        Apply a data file that was edited while the game is running.
+
+        :param change: A change dictionary from DataWatcher.poll().
+        """
+
+class SceneManager:
+    def __init__(self, size=(SCREEN_WIDTH, SCREEN_HEIGHT), caption="Path of the Loner", fps=FPS, telemetry=None, fullscreen=False,
+                 data_watcher=None):
+        """
+        Initialize the SceneManager, which owns the window, clock, fonts and art.
+
+        Screens are laid out for SCREEN_WIDTH x SCREEN_HEIGHT and scaled to the
+        window by the viewport, so the window can be resized or made fullscreen.
+
+        :param size: The window size.
+        :param caption: The default window caption.
+        :param fps: The frame rate used while no input arrives.
+        :param telemetry: Optional Telemetry sink that records frame times.
+        :param fullscreen: Start in fullscreen at the desktop resolution.
+        :param data_watcher: Optional DataWatcher whose reloaded files are passed to every scene.
+        """
+        pygame.init()
+        self.windowed_size = size
+        self.fullscreen = fullscreen
+        self._set_mode()
+        self.viewport = Viewport((SCREEN_WIDTH, SCREEN_HEIGHT), self.screen.get_size())
+        self.caption = caption
+        pygame.display.set_caption(caption)
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.telemetry = telemetry
+        self.scheduler = FrameScheduler(fps, telemetry=telemetry)
+        self.latency = LatencyTracker(telemetry=telemetry)
+        self.data_watcher = data_watcher
+        self.assets = AssetManager()
+        self.stack = []
+        self.running = False
+
+    def _set_mode(self):
+        """
+        Create the window, either resizable or fullscreen at the desktop resolution.
+        """
+        if self.fullscreen:
+            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.screen = pygame.display.set_mode(self.windowed_size, pygame.RESIZABLE)
+
+    def toggle_fullscreen(self):
+        """
+        Switch between windowed and fullscreen mode.
+        """
+        self.fullscreen = not self.fullscreen
+        self._set_mode()
+        self.viewport.resize(self.screen.get_size())
+
+    def _handle_resize(self):
+        """
+        Pick up the new window surface and recompute the layout for it.
+        """
+        self.screen = pygame.display.get_surface()
+        if not self.fullscreen:
+            self.windowed_size = self.screen.get_size()
+        self.viewport.resize(self.screen.get_size())
+
+    def font(self, size):
+        """
+        Get a shared font of the given logical size, scaled for the current window.
+
+        :param size: The logical font size.
+        :return: A pygame.font.Font instance.
+        """
+        return self.viewport.font(size)
+
+    def draw_text(self, text, x, y, color, size):
+        """
+        Draw text at a logical position, reusing the rendered surface across frames.
+
+        :param text: The text to display.
+        :param x: Logical X position of the text.
+        :param y: Logical Y position of the text.
+        :param color: Color of the text.
+        :param size: Logical font size.
+        """
+        self.screen.blit(self.viewport.text(text, size, color), self.viewport.point(x, y))
+
+    @property
+    def current(self):
+        """The scene at the top of the stack, or None."""
+        return self.stack[-1] if self.stack else None
+
+    def _enter(self, scene):
+        """
+        Make a scene the active one.
+
+        :param scene: The scene to activate.
+        """
+        scene.manager = self
+        pygame.display.set_caption(scene.caption or self.caption)
+        scene.on_enter()
+
+    def push(self, scene):
+        """
+        Push a scene on top of the stack and make it active.
+
+        :param scene: The scene to push.
+        """
+        self.stack.append(scene)
+        self._enter(scene)
+
+    def pop(self):
+        """
+        Remove the active scene and return to the one below it.
+
+        :return: The removed scene.
+        """
+        scene = self.stack.pop()
+        scene.on_exit()
+        if self.stack:
+            self._enter(self.stack[-1])
+        return scene
+
+    def replace(self, scene):
+        """
+        Replace the active scene with another one.
+
+        :param scene: The scene to switch to.
+        """
+        if self.stack:
+            self.stack.pop().on_exit()
+        self.push(scene)
+
+    def quit(self):
+        """Stop the run loop after the current frame."""
+        self.running = False
+
+    def _wait_for_next_frame(self, frame_start):
+        """
+        Sleep until the next frame is due, but wake up as soon as input arrives.
+
+        :param frame_start: The time.perf_counter() value at which the current frame began.
+        :return: The events received while waiting.
+        """
+        events = []
+        deadline = frame_start + 1.0 / self.fps
+        while True:
+            remaining_ms = int((deadline - time.perf_counter()) * 1000)
+            if remaining_ms <= 0:
+                break
+            event = pygame.event.wait(remaining_ms)
+            if event.type == pygame.NOEVENT:
+                break
+            events.append(event)
+            if event.type in INPUT_EVENTS:
+                self.latency.input_received(time.perf_counter())
+                break
+        self._last_poll = time.perf_counter()
+        return events
+
+    def run(self):
+        """
+        Run the single game loop until the stack is empty or quit is requested.
+
+        Frames are drawn at the frame rate while idle, and immediately after any
+        input, so the game reacts in the same frame the input is received in.
+        """
+        self.running = True
+        self._last_poll = time.perf_counter()
+        waited_events = []
+
+        while self.running and self.stack:
+            frame_start = time.perf_counter()
+
+            # Input picked up here arrived some time after the last look at the
+            # queue, so timing it from then gives an upper bound on its latency
+            events = pygame.event.get()
+            for event in events:
+                if event.type in INPUT_EVENTS:
+                    self.latency.input_received(self._last_poll)
+
+            for event in waited_events + events:
+                if event.type == pygame.QUIT:
+                    self.quit()
+                    break
+                if event.type == pygame.VIDEORESIZE:
+                    self._handle_resize()
+                    continue
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F11:
+                    self.toggle_fullscreen()
+                    continue
+                if self.stack:
+                    self.stack[-1].handle_event(event)
+
+            scene = self.current
+            if not self.running or scene is None:
+                break
+
+            if self.data_watcher:
+                for change in self.data_watcher.poll():
+                    for loaded in self.stack:
+                        loaded.on_data_reload(change)
+
+            scene.update()
+            self.assets.pump()
+            if scene is self.current:
+                scene.draw()
+                pygame.display.flip()
+                self.latency.frame_presented(time.perf_counter())
+
+            # Spend whatever is left of the frame on background work
+            self.scheduler.run_frame(frame_start)
+
+            waited_events = self._wait_for_next_frame(frame_start)
+            frame_time = self.clock.tick()
+            if self.telemetry:
+                self.telemetry.record(FRAME, frame_time)
+
+        while self.stack:
+            self.stack.pop().on_exit()
+        self.assets.close()
+        if self.telemetry:
+            self.telemetry.close()
+        pygame.quit()
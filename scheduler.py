@@ -0,0 +1,133 @@
+import time
+from collections import deque
+from telemetry import OVERRUN
+
+class Task:
+    def __init__(self, work, name=None, on_done=None):
+        """
+        Initialize a cooperative task.
+
+        :param work: A generator, which is resumed one step at a time, or an iterable
+                     of callables (chunks), which are called one per step.
+        :param name: A readable name used in overrun reports.
+        :param on_done: Optional callback invoked with the task's result when it finishes.
+        """
+        self.name = name or getattr(work, "__name__", "task")
+        self.on_done = on_done
+        self.result = None
+        self.done = False
+        self.steps = 0
+        self._steps = work if hasattr(work, "send") else self._run_chunks(work)
+
+    def _run_chunks(self, chunks):
+        """
+        Turn an iterable of callables into a generator running one chunk per step.
+
+        :param chunks: The callables to run.
+        :return: The result of the last chunk.
+        """
+        result = None
+        for chunk in chunks:
+            result = chunk()
+            yield
+        return result
+
+    def step(self):
+        """
+        Run the task up to its next yield.
+
+        :return: True if the task finished during this step.
+        """
+        self.steps += 1
+        try:
+            next(self._steps)
+        except StopIteration as stop:
+            self.result = stop.value
+            self.done = True
+            if self.on_done is not None:
+                self.on_done(self.result)
+        return self.done
+
+class FrameScheduler:
+    def __init__(self, fps=30, reserve=0.004, max_overruns=100, telemetry=None):
+        """
+        Initialize a scheduler that runs background game work in the time left within each frame.
+
+        :param fps: The frame rate the frame budget is derived from.
+        :param reserve: Seconds of each frame kept free for event handling jitter and the display flip.
+        :param max_overruns: Number of overrun reports kept.
+        :param telemetry: Optional Telemetry sink that records overruns.
+        """
+        self.frame_budget = 1.0 / fps
+        self.reserve = reserve
+        self.telemetry = telemetry
+        self.tasks = deque()
+        self.overruns = deque(maxlen=max_overruns)
+
+    def spawn(self, work, name=None, on_done=None):
+        """
+        Schedule a generator or chunked task.
+
+        :param work: A generator or an iterable of callables.
+        :param name: A readable name used in overrun reports.
+        :param on_done: Optional callback invoked with the task's result.
+        :return: The scheduled Task.
+        """
+        task = work if isinstance(work, Task) else Task(work, name, on_done)
+        self.tasks.append(task)
+        return task
+
+    def cancel(self, task):
+        """
+        Remove a pending task without running it further.
+
+        :param task: The task to cancel.
+        """
+        if task in self.tasks:
+            self.tasks.remove(task)
+
+    def finish(self, task):
+        """
+        Run a task to completion right away, for when its result is needed now.
+
+        :param task: The task to finish.
+        :return: The task's result.
+        """
+        self.cancel(task)
+        while not task.done:
+            task.step()
+        return task.result
+
+    def run_frame(self, frame_start):
+        """
+        Step pending tasks round-robin until the frame's budget is used up.
+
+        :param frame_start: The time.perf_counter() value at which the frame began.
+        """
+        deadline = frame_start + self.frame_budget - self.reserve
+        clock = time.perf_counter
+        now = clock()
+
+        while self.tasks and now < deadline:
+            task = self.tasks.popleft()
+            started = now
+            finished = task.step()
+            now = clock()
+
+            if now > deadline:
+                self._report_overrun(task, now - started, now - deadline)
+            if not finished:
+                self.tasks.append(task)
+
+    def _report_overrun(self, task, step_time, overrun):
+        """
+        Record a task step that ran past the end of the frame budget.
+
+        :param task: The task that overran.
+        :param step_time: Duration of the step in seconds.
+        :param overrun: How far past the deadline the step finished, in seconds.
+        """
+        report = (task.name, task.steps, step_time * 1000, overrun * 1000)
+        self.overruns.append(report)
+        if self.telemetry:
+            self.telemetry.record(OVERRUN, *report)
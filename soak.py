@@ -0,0 +1,250 @@
+import argparse
+from array import array
+import json
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+
+# Scripted input, cycled one key per frame: alternate between the player's moves
+# and confirm everything else (moves, turn resolution, reward pop-ups)
+SCRIPT = ("K_RETURN", "K_RETURN", "K_DOWN", "K_RETURN", "K_RETURN", "K_RETURN")
+
+# Traced growth above this slope (bytes per floor) after the warm-up is flagged as a possible
+# leak; the RSS slope is only reported, since the allocator rarely hands memory back
+TRACED_GROWTH_THRESHOLD = 256
+
+# Floors that must be left after the warm-up for the growth to be judged at all
+MIN_MEASURED_FLOORS = 100
+
+def _rss_bytes():
+    """
+    Get the current resident set size of this process.
+
+    :return: The RSS in bytes, or the peak RSS where the current one is unavailable.
+    """
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def _slope(values):
+    """
+    Fit a least-squares line through evenly spaced samples.
+
+    :param values: The samples, one per floor.
+    :return: The slope in units per floor.
+    """
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    denominator = sum((x - mean_x) ** 2 for x in range(n))
+    return numerator / denominator
+
+def _warmup_state(game):
+    """
+    Get what still grows while a run warms up: the loaded modules and the bounded caches.
+
+    :param game: The MainGameLoop being soaked.
+    :return: A tuple that stops changing once lazy imports ran and the caches are full.
+    """
+    autopilot_cache = len(game.autopilot.cache) if game.autopilot else 0
+    return len(sys.modules), len(game.floor_generator.scaler.cache), autopilot_cache
+
+def _top_allocators(snapshot, limit):
+    """
+    Summarize the biggest allocation sites of a tracemalloc snapshot.
+
+    :param snapshot: The tracemalloc snapshot.
+    :param limit: Number of sites to keep.
+    :return: A list of (site, size in bytes, allocation count) tuples.
+    """
+    return [(str(stat.traceback[0]), stat.size, stat.count) for stat in _game_traces(snapshot).statistics("lineno")[:limit]]
+
+def _game_traces(snapshot):
+    """
+    Drop the soak runner's own bookkeeping from a tracemalloc snapshot.
+
+    :param snapshot: The tracemalloc snapshot.
+    :return: The filtered snapshot.
+    """
+    return snapshot.filter_traces((
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+
+def soak_worker(worker_id, floors, seed, profile_path, monster_db_path, snapshot_every=100, top_n=10, immortal=True):
+    """
+    Play one headless PvE run with scripted input and sample its memory per floor.
+
+    :param worker_id: Index of the worker, used in the report.
+    :param floors: Number of floors to clear.
+    :param seed: Seed for the game's randomness.
+    :param profile_path: Path to the character profile JSON file.
+    :param monster_db_path: Path to the monster database JSON file.
+    :param snapshot_every: Take a top-allocator snapshot every this many floors.
+    :param top_n: Number of allocation sites kept per snapshot.
+    :param immortal: Keep the player alive so the run can go on for thousands of floors.
+    :return: A dictionary with the worker's samples and growth analysis.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from main_game_loop import MainGameLoop
+
+    # Preallocate the samples so recording them does not show up as growth
+    rss_samples = array("q", bytes(8 * floors))
+    traced_samples = array("q", bytes(8 * floors))
+    sampled = 0
+    snapshots = []
+
+    tracemalloc.start()
+    game = MainGameLoop(profile_path, monster_db_path, seed=seed)
+    max_health = game.player_stats["health"]
+    script = [pygame.event.Event(pygame.KEYDOWN, key=getattr(pygame, name)) for name in SCRIPT]
+    restart = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_UP)
+
+    first_snapshot = None
+    warmup_state = _warmup_state(game)
+    warmup = 0
+    floor = game.current_floor_number
+    frames = 0
+    restarts = 0
+    start = time.perf_counter()
+
+    while sampled < floors:
+        restarted = game.turn_state == "game_over"
+        if restarted:
+            game.handle_event(restart)
+            restarts += 1
+        else:
+            game.handle_event(script[frames % len(script)])
+        game.update()
+        frames += 1
+        if immortal:
+            game.player_stats["health"] = max_health
+
+        # A new floor, or a fresh run after a defeat, counts as one floor sample
+        if game.current_floor_number != floor or restarted:
+            floor = game.current_floor_number
+            rss_samples[sampled] = _rss_bytes()
+            traced_samples[sampled] = tracemalloc.get_traced_memory()[0]
+            sampled += 1
+
+            # The warm-up lasts until the last floor that imported a module or grew a bounded cache
+            state = _warmup_state(game)
+            if state != warmup_state:
+                warmup_state = state
+                warmup = sampled
+
+            if sampled % snapshot_every == 1 or snapshot_every == 1:
+                snapshot = tracemalloc.take_snapshot()
+                if first_snapshot is None:
+                    first_snapshot = snapshot
+                snapshots.append({"floor": sampled, "top": _top_allocators(snapshot, top_n)})
+
+    # Compare the last state against the first snapshot to show where memory grew
+    growth = [(str(stat.traceback[0]), stat.size_diff, stat.count_diff)
+              for stat in _game_traces(tracemalloc.take_snapshot()).compare_to(_game_traces(first_snapshot), "lineno")[:top_n]]
+    tracemalloc.stop()
+
+    # Only judge the floors after the warm-up, and only if enough of them are left
+    warmup = max(warmup, floors // 10)
+    rss_slope = _slope(rss_samples[warmup:])
+    traced_slope = _slope(traced_samples[warmup:])
+    if floors - warmup < MIN_MEASURED_FLOORS:
+        leak_suspected = None
+    else:
+        leak_suspected = traced_slope > TRACED_GROWTH_THRESHOLD
+    return {
+        "worker": worker_id,
+        "seed": seed,
+        "floors": floors,
+        "frames": frames,
+        "restarts": restarts,
+        "seconds": time.perf_counter() - start,
+        "rss_start": rss_samples[0],
+        "rss_end": rss_samples[-1],
+        "rss_slope": rss_slope,
+        "traced_start": traced_samples[0],
+        "traced_end": traced_samples[-1],
+        "traced_slope": traced_slope,
+        "warmup": warmup,
+        "leak_suspected": leak_suspected,
+        "snapshots": snapshots,
+        "growth": growth,
+        "rss_samples": rss_samples.tolist(),
+        "traced_samples": traced_samples.tolist(),
+    }
+
+def _run_worker(kwargs):
+    """
+    Unpack keyword arguments for soak_worker inside a pool process.
+    """
+    return soak_worker(**kwargs)
+
+def run_soak(workers=4, floors=2000, seed=0, profile_path="character_profile.json", monster_db_path="data/monsters.json",
+             snapshot_every=100, top_n=10, immortal=True):
+    """
+    Run soak workers in parallel processes.
+
+    :return: A list of per-worker reports.
+    """
+    jobs = [{
+        "worker_id": worker_id,
+        "floors": floors,
+        "seed": seed + worker_id,
+        "profile_path": profile_path,
+        "monster_db_path": monster_db_path,
+        "snapshot_every": snapshot_every,
+        "top_n": top_n,
+        "immortal": immortal,
+    } for worker_id in range(workers)]
+
+    with multiprocessing.Pool(processes=workers) as pool:
+        return pool.map(_run_worker, jobs)
+
+def print_report(reports):
+    """
+    Print a summary of the soak reports.
+
+    :param reports: The per-worker reports.
+    """
+    print("Soak Report:")
+    for report in reports:
+        flag = {True: "GROWTH", False: "ok", None: "still warming up"}[report["leak_suspected"]]
+        print(f"  Worker {report['worker']} (seed {report['seed']}): {report['floors']} floors, {report['frames']} frames "
+              f"in {report['seconds']:.1f}s - RSS {report['rss_start'] / 1024:.0f} -> {report['rss_end'] / 1024:.0f} KiB "
+              f"({report['rss_slope']:+.1f} B/floor), traced {report['traced_start'] / 1024:.0f} -> "
+              f"{report['traced_end'] / 1024:.0f} KiB ({report['traced_slope']:+.1f} B/floor after {report['warmup']} "
+              f"warm-up floors) [{flag}]")
+        if report["leak_suspected"]:
+            for site, size_diff, count_diff in report["growth"][:5]:
+                print(f"    - {site}: {size_diff:+d} B in {count_diff:+d} blocks")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run headless PvE soak tests and track memory growth per floor.")
+    parser.add_argument("--workers", type=int, default=4, help="Number of worker processes.")
+    parser.add_argument("--floors", type=int, default=2000, help="Floors each worker clears.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first worker; the others count up from it.")
+    parser.add_argument("--profile", default="character_profile.json", help="Character profile to play.")
+    parser.add_argument("--monsters", default="data/monsters.json", help="Monster database to fight.")
+    parser.add_argument("--snapshot-every", type=int, default=100, help="Floors between top-allocator snapshots.")
+    parser.add_argument("--mortal", action="store_true", help="Let the player die and restart instead of staying alive.")
+    parser.add_argument("--output", default="soak_report.json", help="Where to write the full JSON report.")
+    args = parser.parse_args()
+
+    reports = run_soak(args.workers, args.floors, args.seed, args.profile, args.monsters,
+                       args.snapshot_every, immortal=not args.mortal)
+    with open(args.output, "w") as file:
+        json.dump(reports, file, indent=4)
+    print_report(reports)
+    print(f"Full report written to {args.output}")
+    sys.exit(1 if any(report["leak_suspected"] is True for report in reports) else 0)
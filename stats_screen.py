@@ -0,0 +1,114 @@
+import json
+import pygame
+from combat_rules import TYPE_CODES
+from combat_stats import summarize
+from scene_manager import Scene
+
+# Constants
+FONT = 36
+SMALL_FONT = 24
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+YELLOW = (255, 255, 0)
+GRAY = (128, 128, 128)
+
+# UI Constants
+UI_PADDING = 20
+COLUMN_X = 420
+
+class StatsScreen(Scene):
+    caption = "Statistics"
+
+    def __init__(self, combat_stats, monster_db_path="data/monsters.json"):
+        """
+        Initialize the statistics screen, with this run's stats on the left and lifetime stats on the right.
+
+        :param combat_stats: The CombatStats to read from.
+        :param monster_db_path: Path to the monster database, for the monster and attack names.
+        """
+        self.combat_stats = combat_stats
+        with open(monster_db_path, "r") as file:
+            self.monsters = {monster["id"]: monster for monster in json.load(file)}
+        self.summaries = []
+
+    def on_enter(self):
+        """
+        Aggregate the counters once when the screen opens.
+        """
+        self.summaries = [
+            ("This run", summarize(self.combat_stats.run, self.monsters)),
+            ("Lifetime", summarize(self.combat_stats.lifetime, self.monsters)),
+        ]
+
+    def draw_text(self, text, x, y, color=WHITE, font=FONT):
+        """
+        Draw text on the screen.
+
+        :param text: The text to display.
+        :param x: Logical X position of the text.
+        :param y: Logical Y position of the text.
+        :param color: Color of the text.
+        :param font: Size of the shared font to use for the text.
+        """
+        self.manager.draw_text(text, x, y, color, font)
+
+    def handle_event(self, event):
+        """
+        Return to the previous screen on ENTER or ESCAPE.
+
+        :param event: The Pygame event to handle.
+        """
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_ESCAPE):
+            self.manager.pop()
+
+    def draw_summary(self, title, summary, x):
+        """
+        Draw one column of aggregated stats.
+
+        :param title: The column's title.
+        :param summary: The summary from combat_stats.summarize().
+        :param x: Logical X position of the column.
+        """
+        self.draw_text(f"{title}: {summary['turns']} turns", x, 70, YELLOW, SMALL_FONT)
+        if not summary["turns"]:
+            self.draw_text("No turns played yet.", x, 100, GRAY, SMALL_FONT)
+            return
+
+        y = 100
+        for outcome, count in summary["outcomes"].items():
+            self.draw_text(f"{outcome.capitalize()}: {count / summary['turns']:.0%}", x, y, WHITE, SMALL_FONT)
+            y += 24
+
+        # Turns per matchup, players' types down and enemies' types across
+        y += 8
+        types = list(TYPE_CODES)
+        self.draw_text("You \\ Enemy", x, y, GRAY, SMALL_FONT)
+        for column, enemy_type in enumerate(types):
+            self.draw_text(enemy_type, x + 130 + column * 90, y, GRAY, SMALL_FONT)
+        for player_type in types:
+            y += 24
+            self.draw_text(player_type, x, y, GRAY, SMALL_FONT)
+            for column, enemy_type in enumerate(types):
+                self.draw_text(str(summary["matchups"][(player_type, enemy_type)]), x + 130 + column * 90, y, WHITE, SMALL_FONT)
+
+        y += 40
+        self.draw_text("Hardest-hitting attacks:", x, y, YELLOW, SMALL_FONT)
+        for damage, uses, monster_name, attack_name in summary["top_attacks"]:
+            y += 24
+            self.draw_text(f"- {monster_name} {attack_name}: {damage:.0f} ({uses}x)", x, y, WHITE, SMALL_FONT)
+
+        y += 40
+        self.draw_text("Longest fights:", x, y, YELLOW, SMALL_FONT)
+        for turns_per_kill, name, kills in summary["slowest_monsters"]:
+            y += 24
+            self.draw_text(f"- {name}: {turns_per_kill:.1f} turns ({kills} kills)", x, y, WHITE, SMALL_FONT)
+
+    def draw(self):
+        """
+        Draw the statistics.
+        """
+        self.screen.fill(BLACK)
+        self.draw_text("Statistics", UI_PADDING, 20, WHITE)
+        for column, (title, summary) in enumerate(self.summaries):
+            self.draw_summary(title, summary, UI_PADDING + column * COLUMN_X)
+        self.draw_text("Press ENTER to go back", UI_PADDING, 560, YELLOW, SMALL_FONT)
@@ -0,0 +1,201 @@
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+# Event kinds recorded by the game, each with a single field layout
+COMBAT = "combat"  # floor, monster id, player type, enemy type, outcome, damage dealt, damage taken
+UNDO = "undo"  # floor, monster id, number of combat events taken back
+LOOT = "loot"  # monster id, item, quantity
+FLOOR = "floor"  # floor, room
+FRAME = "frame"  # frame time in ms
+LATENCY = "latency"  # input latency in ms
+OVERRUN = "overrun"  # task name, step, step time in ms, overrun in ms
+PVP_COMBAT = "pvp_combat"  # enemy name, player type, enemy type, outcome, damage dealt, damage taken
+
+# Environment variable that opts a session into telemetry
+TELEMETRY_DIR_ENV = "LONER_TELEMETRY_DIR"
+
+class Telemetry:
+    def __init__(self, directory, batch_size=1024, max_file_bytes=4 * 1024 * 1024, max_files=16):
+        """
+        Initialize an opt-in telemetry sink.
+
+        Events are appended to an in-memory batch on the game thread. Full batches
+        are handed to a background thread, which writes them as gzip-compressed JSON
+        lines into rotating files.
+
+        :param directory: Directory the event files are written to.
+        :param batch_size: Number of events collected before a batch is handed off.
+        :param max_file_bytes: Compressed size after which a new file is started.
+        :param max_files: Number of files kept before the oldest ones are deleted.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.dropped_batches = 0
+
+        self._batch = []
+        self._clock = time.perf_counter
+        self._queue = queue.Queue(maxsize=64)
+        self._file = None
+        self._raw_file = None
+        self._file_index = self._next_file_index()
+        self._writer = threading.Thread(target=self._write_loop, name="telemetry-writer", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create a telemetry sink if the player opted in through the environment.
+
+        :return: A Telemetry instance, or None if telemetry is disabled.
+        """
+        directory = os.environ.get(TELEMETRY_DIR_ENV)
+        if not directory:
+            return None
+        return cls(directory)
+
+    def record(self, kind, *fields):
+        """
+        Record a single event. This is the only call made on the game thread.
+
+        :param kind: One of the event kinds declared at the top of this module.
+        :param fields: Compact positional fields for the event, in the kind's layout.
+        """
+        batch = self._batch
+        batch.append((self._clock(), kind, fields))
+        if len(batch) >= self.batch_size:
+            self._hand_off()
+
+    def _hand_off(self):
+        """
+        Swap the current batch for an empty one and queue it for writing.
+        """
+        batch, self._batch = self._batch, []
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            # Never block the game thread on a slow disk
+            self.dropped_batches += 1
+
+    def flush(self):
+        """
+        Hand off any pending events and wait until they are written to disk.
+        """
+        if self._batch:
+            self._hand_off()
+        self._queue.join()
+
+    def close(self):
+        """
+        Flush pending events and stop the writer thread.
+        """
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+
+    def _next_file_index(self):
+        """
+        Find the index following the newest existing event file.
+
+        :return: The index of the next file to create.
+        """
+        indices = [int(path.name.split("-")[1].split(".")[0]) for path in self.directory.glob("events-*.jsonl.gz")]
+        return max(indices, default=0) + 1
+
+    def _open_file(self):
+        """
+        Open the next rotating event file and prune old ones.
+        """
+        path = self.directory / f"events-{self._file_index:06d}.jsonl.gz"
+        self._file_index += 1
+        self._raw_file = open(path, "wb")
+        self._file = gzip.GzipFile(fileobj=self._raw_file, mode="wb")
+
+        files = sorted(self.directory.glob("events-*.jsonl.gz"))
+        for old_path in files[:-self.max_files]:
+            old_path.unlink()
+
+    def _close_file(self):
+        """
+        Close the current event file, if any.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._raw_file.close()
+            self._file = None
+            self._raw_file = None
+
+    def _write_loop(self):
+        """
+        Write queued batches to disk until a stop marker is received.
+        """
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is None:
+                    self._close_file()
+                    return
+                if self._file is None:
+                    self._open_file()
+                lines = [json.dumps([timestamp, kind, *fields], separators=(",", ":")) for timestamp, kind, fields in batch]
+                self._file.write(("\n".join(lines) + "\n").encode("utf-8"))
+                self._file.flush()
+                if self._raw_file.tell() >= self.max_file_bytes:
+                    self._close_file()
+            finally:
+                self._queue.task_done()
+
+def read_events(directory, kinds=None):
+    """
+    Stream events from the telemetry files in a directory, oldest first.
+
+    :param directory: Directory containing the event files.
+    :param kinds: Optional collection of event kinds to keep.
+    :return: A generator of (timestamp, kind, fields) tuples.
+    """
+    for path in sorted(Path(directory).glob("events-*.jsonl.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            try:
+                for line in file:
+                    timestamp, kind, *fields = json.loads(line)
+                    if kinds is None or kind in kinds:
+                        yield timestamp, kind, fields
+            except (EOFError, gzip.BadGzipFile, json.JSONDecodeError):
+                # The newest file may still be open or was cut short by a crash
+                continue
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    from collections import Counter
+    from latency import LatencyTracker
+
+    # Summarize a telemetry directory
+    directory = sys.argv[1] if len(sys.argv) > 1 else os.environ.get(TELEMETRY_DIR_ENV, "telemetry")
+    counts = Counter()
+    frame_times = []
+    latency = LatencyTracker(max_samples=None)
+    for timestamp, kind, fields in read_events(directory):
+        counts[kind] += 1
+        if kind == FRAME:
+            frame_times.append(fields[0])
+        elif kind == LATENCY:
+            latency.samples.append(fields[0])
+
+    print("Telemetry Summary:")
+    for kind, count in counts.most_common():
+        print(f"  - {kind}: {count} events")
+    if frame_times:
+        frame_times.sort()
+        print(f"  - median frame time: {frame_times[len(frame_times) // 2]:.2f} ms")
+    if latency.samples:
+        stats = latency.stats()
+        print(f"  - input latency: p50 {stats['p50']:.1f} ms, p99 {stats['p99']:.1f} ms, max {stats['max']:.1f} ms "
+              f"({stats['count']} inputs)")
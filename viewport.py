@@ -0,0 +1,129 @@
+import pygame
+from cache import LRUCache
+
+class Viewport:
+    def __init__(self, logical_size, output_size, text_cache_size=512, surface_cache_size=64):
+        """
+        Initialize the mapping from the logical layout to the real window.
+
+        Screens lay themselves out in logical coordinates. The viewport scales them
+        uniformly to fit the window, centered with letterboxing. Fonts, rendered text
+        and scaled surfaces are cached for the current output size and rebuilt only on resize.
+
+        :param logical_size: The (width, height) the screens are laid out for.
+        :param output_size: The (width, height) of the window.
+        :param text_cache_size: Number of rendered text surfaces kept.
+        :param surface_cache_size: Number of scaled surfaces kept.
+        """
+        self.logical_width, self.logical_height = logical_size
+        self._fonts = {}
+        self._text = LRUCache(text_cache_size)
+        self._surfaces = LRUCache(surface_cache_size)
+        self.resize(output_size)
+
+    def resize(self, output_size):
+        """
+        Recompute the layout for a new window size and drop everything cached for the old one.
+
+        :param output_size: The (width, height) of the window.
+        """
+        self.output_width, self.output_height = output_size
+        self.scale = min(self.output_width / self.logical_width, self.output_height / self.logical_height)
+        self.offset_x = (self.output_width - self.logical_width * self.scale) / 2
+        self.offset_y = (self.output_height - self.logical_height * self.scale) / 2
+        self._fonts.clear()
+        self._text.clear()
+        self._surfaces.clear()
+
+    def point(self, x, y):
+        """
+        Map a logical position to the window.
+
+        :param x: Logical X position.
+        :param y: Logical Y position.
+        :return: The (x, y) pixel position in the window.
+        """
+        return (round(self.offset_x + x * self.scale), round(self.offset_y + y * self.scale))
+
+    def rect(self, x, y, width, height):
+        """
+        Map a logical rectangle to the window.
+
+        :return: A pygame.Rect in window pixels.
+        """
+        left, top = self.point(x, y)
+        right, bottom = self.point(x + width, y + height)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def length(self, value):
+        """
+        Scale a logical length, such as a line width, keeping it at least one pixel.
+
+        :param value: The logical length.
+        :return: The length in window pixels.
+        """
+        return max(1, round(value * self.scale))
+
+    def font(self, size):
+        """
+        Get a font of the given logical size, rendered at the window's scale.
+
+        :param size: The logical font size.
+        :return: A pygame.font.Font instance.
+        """
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pygame.font.Font(None, max(1, round(size * self.scale)))
+        return font
+
+    def text(self, text, size, color):
+        """
+        Get a rendered text surface, rendering it only the first time it is shown at this size.
+
+        :param text: The text to render.
+        :param size: The logical font size.
+        :param color: The text color.
+        :return: A pygame.Surface.
+        """
+        key = (text, size, color)
+        surface = self._text.get(key)
+        if surface is None:
+            surface = self.font(size).render(text, True, color)
+            self._text.put(key, surface)
+        return surface
+
+    def overlay(self, color):
+        """
+        Get a window-sized translucent surface, such as the dimming behind pop-ups.
+
+        The surface is uniformly translucent, which blends much faster than per-pixel alpha
+        on large windows.
+
+        :param color: The RGBA fill color.
+        :return: A pygame.Surface.
+        """
+        key = ("overlay", color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = pygame.Surface((self.output_width, self.output_height)).convert()
+            surface.fill(color[:3])
+            surface.set_alpha(color[3])
+            self._surfaces.put(key, surface)
+        return surface
+
+    def scaled(self, key, surface, width, height):
+        """
+        Get a surface scaled to a logical size, scaling it once per window size.
+
+        :param key: A key identifying the source surface.
+        :param surface: The source surface.
+        :param width: The logical width to scale to.
+        :param height: The logical height to scale to.
+        :return: A pygame.Surface.
+        """
+        cache_key = ("scaled", key, width, height)
+        scaled = self._surfaces.get(cache_key)
+        if scaled is None:
+            scaled = pygame.transform.smoothscale(surface, (self.length(width), self.length(height)))
+            self._surfaces.put(cache_key, scaled)
+        return scaled